@@ -0,0 +1,128 @@
+"""
+Admission control untuk inference server
+Jumlah request yang diproses bersamaan dibatasi; kelebihannya menunggu di
+antrian terbatas dengan deadline. Request ditolak cepat (503 + Retry-After)
+jika antrian penuh, deadline-nya sudah lewat, atau tidak mendapat slot
+sebelum timeout antrian habis, sehingga latensi request yang diterima tetap
+terjaga saat lonjakan trafik.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Overloaded(Exception):
+    """Request ditolak oleh admission control; reason = queue_full/timeout/deadline"""
+
+    def __init__(self, reason='queue_full'):
+        super().__init__(f"server overloaded ({reason})")
+        self.reason = reason
+
+
+class AdmissionController:
+    """
+    Batas request in-flight dengan antrian tunggu terbatas
+
+    Parameters:
+    -----------
+    max_in_flight : int
+        Jumlah request yang boleh diproses bersamaan
+    max_queue : int
+        Jumlah request yang boleh menunggu slot
+    queue_timeout : float
+        Waktu tunggu maksimum di antrian (detik)
+    shed_counter : prometheus_client.Counter, optional
+        Counter dengan label 'reason' untuk request yang ditolak
+    queue_depth_gauge, in_flight_gauge : prometheus_client.Gauge, optional
+    queue_wait_histogram : prometheus_client.Histogram, optional
+        Waktu tunggu request yang akhirnya diterima (detik)
+    """
+
+    def __init__(self, max_in_flight, max_queue=64, queue_timeout=0.1, shed_counter=None,
+                 queue_depth_gauge=None, in_flight_gauge=None, queue_wait_histogram=None):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be >= 1")
+        if max_queue < 0:
+            raise ValueError("max_queue must be >= 0")
+
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.shed_counter = shed_counter
+        self.queue_depth_gauge = queue_depth_gauge
+        self.in_flight_gauge = in_flight_gauge
+        self.queue_wait_histogram = queue_wait_histogram
+
+        self.in_flight = 0
+        self.waiting = 0
+        self._cond = threading.Condition()
+
+    def _shed(self, reason):
+        if self.shed_counter is not None:
+            self.shed_counter.labels(reason=reason).inc()
+        raise Overloaded(reason)
+
+    def _set_gauges(self):
+        if self.queue_depth_gauge is not None:
+            self.queue_depth_gauge.set(self.waiting)
+        if self.in_flight_gauge is not None:
+            self.in_flight_gauge.set(self.in_flight)
+
+    def acquire(self, deadline=None):
+        """
+        Ambil satu slot atau raise Overloaded
+
+        deadline : float, optional
+            Batas waktu request (time.monotonic()) dari client; slot yang baru
+            didapat setelah deadline tidak ada gunanya
+        """
+        now = time.monotonic()
+        give_up_at = now + self.queue_timeout
+        if deadline is not None:
+            if deadline <= now:
+                self._shed('deadline')
+            give_up_at = min(give_up_at, deadline)
+
+        with self._cond:
+            # Jalur cepat: ada slot kosong dan tidak ada yang antri lebih dulu
+            if self.in_flight < self.max_in_flight and self.waiting == 0:
+                self.in_flight += 1
+                self._set_gauges()
+                return
+            if self.waiting >= self.max_queue:
+                self._shed('queue_full')
+
+            self.waiting += 1
+            self._set_gauges()
+            try:
+                while self.in_flight >= self.max_in_flight:
+                    remaining = give_up_at - time.monotonic()
+                    if remaining <= 0:
+                        reason = 'deadline' if deadline is not None and give_up_at == deadline else 'timeout'
+                        # Wakeup dari release() mungkin jatuh ke waiter ini tepat saat
+                        # deadline-nya habis; teruskan ke waiter lain agar slot tidak menganggur
+                        self._cond.notify()
+                        self._shed(reason)
+                    self._cond.wait(remaining)
+                self.in_flight += 1
+            finally:
+                self.waiting -= 1
+                self._set_gauges()
+
+        if self.queue_wait_histogram is not None:
+            self.queue_wait_histogram.observe(time.monotonic() - now)
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._set_gauges()
+            self._cond.notify()
+
+    @contextmanager
+    def admit(self, deadline=None):
+        """Context manager: acquire() di awal, release() di akhir"""
+        self.acquire(deadline)
+        try:
+            yield
+        finally:
+            self.release()
@@ -0,0 +1,189 @@
+"""
+Dynamic micro-batching untuk inference server
+Request /predict yang datang bersamaan digabung menjadi satu panggilan model,
+lalu hasilnya dipecah lagi per request
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from stage_timer import record_offloaded_cpu
+
+
+class _PendingRequest:
+    """Satu request yang sedang menunggu di antrian batch"""
+    __slots__ = ('X', 'return_proba', 'future', 'enqueued_at', 'cpu_seconds')
+
+    def __init__(self, X, return_proba):
+        self.X = X
+        self.return_proba = return_proba
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+        # Bagian CPU time panggilan model batch (proporsional jumlah baris)
+        self.cpu_seconds = 0.0
+
+
+class MicroBatcher:
+    """
+    Menahan request masuk paling lama max_wait_ms atau sampai max_batch_size baris
+    terkumpul, kemudian menjalankan satu prediksi vectorized untuk semuanya
+
+    Parameters:
+    -----------
+    predict_fn : callable
+        Fungsi predict_fn(X, return_proba) -> (preds, proba, ...); elemen setelah
+        proba (mis. model yang dipakai) diteruskan apa adanya ke setiap request
+    max_batch_size : int
+        Jumlah baris maksimum dalam satu batch
+    max_wait_ms : float
+        Waktu tunggu maksimum (ms) sejak request pertama di batch masuk antrian
+    batch_size_histogram : prometheus_client.Histogram, optional
+        Histogram untuk jumlah baris per batch
+    queue_wait_histogram : prometheus_client.Histogram, optional
+        Histogram untuk waktu tunggu request di antrian (detik)
+    batch_cpu_histogram : prometheus_client.Histogram, optional
+        Histogram untuk CPU time thread batcher per panggilan model (detik)
+    """
+
+    def __init__(self, predict_fn, max_batch_size=64, max_wait_ms=2.0,
+                 batch_size_histogram=None, queue_wait_histogram=None,
+                 batch_cpu_histogram=None):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must be >= 0")
+
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.batch_size_histogram = batch_size_histogram
+        self.queue_wait_histogram = queue_wait_histogram
+        self.batch_cpu_histogram = batch_cpu_histogram
+
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        """Menjalankan worker thread batching"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Menghentikan worker thread, request yang tersisa tetap diproses"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _enqueue(self, X, return_proba):
+        if self._thread is None:
+            raise RuntimeError("MicroBatcher belum di-start")
+        pending = _PendingRequest(X, return_proba)
+        self._queue.put(pending)
+        return pending
+
+    def submit(self, X, return_proba=False):
+        """Masukkan matrix X ke antrian, mengembalikan Future berisi (preds, proba)"""
+        return self._enqueue(X, return_proba).future
+
+    def predict(self, X, return_proba=False, timeout=None):
+        """Prediksi X lewat antrian batch dan tunggu hasilnya"""
+        # Request yang sudah sebesar batch tidak perlu menunggu digabung
+        if X.shape[0] >= self.max_batch_size:
+            if self.batch_size_histogram is not None:
+                self.batch_size_histogram.observe(X.shape[0])
+            return self.predict_fn(X, return_proba)
+        pending = self._enqueue(X, return_proba)
+        try:
+            return pending.future.result(timeout=timeout)
+        finally:
+            # Model dihitung di thread batcher, jadi thread_time() request ini
+            # tidak melihatnya; titipkan bagiannya ke RequestTimer
+            record_offloaded_cpu(pending.cpu_seconds)
+
+    # --------------------------------------------
+    # WORKER
+    # --------------------------------------------
+    def _collect(self, first):
+        """Kumpulkan request sampai batch penuh atau max_wait habis"""
+        batch = [first]
+        rows = first.X.shape[0]
+        deadline = first.enqueued_at + self.max_wait
+
+        while rows < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    item = self._queue.get(timeout=remaining)
+                else:
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Sentinel stop: proses batch ini dulu, lalu keluar
+                self._queue.put(None)
+                break
+            batch.append(item)
+            rows += item.X.shape[0]
+
+        return batch, rows
+
+    def _execute(self, batch, rows):
+        """Satu panggilan model untuk seluruh batch, lalu bagikan hasil per request"""
+        dispatched_at = time.perf_counter()
+        if self.batch_size_histogram is not None:
+            self.batch_size_histogram.observe(rows)
+        if self.queue_wait_histogram is not None:
+            for item in batch:
+                self.queue_wait_histogram.observe(dispatched_at - item.enqueued_at)
+
+        want_proba = any(item.return_proba for item in batch)
+        cpu_start = time.thread_time()
+        try:
+            if len(batch) == 1:
+                X = batch[0].X
+            else:
+                X = np.concatenate([item.X for item in batch], axis=0)
+            preds, proba, *extra = self.predict_fn(X, want_proba)
+        except Exception as e:
+            self._attribute_cpu(batch, rows, time.thread_time() - cpu_start)
+            for item in batch:
+                item.future.set_exception(e)
+            return
+        self._attribute_cpu(batch, rows, time.thread_time() - cpu_start)
+
+        offset = 0
+        for item in batch:
+            end = offset + item.X.shape[0]
+            item_proba = proba[offset:end] if (proba is not None and item.return_proba) else None
+            item.future.set_result((preds[offset:end], item_proba, *extra))
+            offset = end
+
+    def _attribute_cpu(self, batch, rows, cpu):
+        """Bagi CPU time satu panggilan model ke tiap request sesuai porsi barisnya"""
+        if self.batch_cpu_histogram is not None:
+            self.batch_cpu_histogram.observe(cpu)
+        for item in batch:
+            item.cpu_seconds = cpu * item.X.shape[0] / rows if rows else 0.0
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch, rows = self._collect(first)
+            self._execute(batch, rows)
+
+        # Jangan tinggalkan request menggantung setelah stop
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item.future.set_exception(RuntimeError("MicroBatcher stopped"))
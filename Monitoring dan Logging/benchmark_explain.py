@@ -0,0 +1,84 @@
+"""
+Benchmark /explain (Saabas) terhadap predict_proba pada berbagai ukuran batch
+Untuk setiap ukuran batch dilaporkan median latensi predict_proba model yang
+dilayani, median latensi SaabasExplainer.explain, rasionya, serta selisih
+maksimum bias + jumlah kontribusi terhadap predict_proba (harus ~0).
+
+Penggunaan:
+    python benchmark_explain.py --model-uri <path model>
+    python benchmark_explain.py --run-id <run_id> --engine compiled --batch-sizes 1 64 4096
+"""
+import sys
+import time
+import argparse
+
+import numpy as np
+
+from explain import SaabasExplainer
+from forest_engine import CompiledForest, default_data_path, load_sklearn_model
+from serve_model_direct import find_model_artifact_path
+from warmup import load_replay_rows
+
+
+def time_call(fn, X, repeats):
+    """Median detik per panggilan fn(X)"""
+    fn(X)
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Saabas explain vs predict')
+    parser.add_argument('--run-id', type=str, help='MLflow run ID')
+    parser.add_argument('--model-uri', type=str, help='Path model langsung (alternatif --run-id)')
+    parser.add_argument('--data', default=default_data_path(), help='CSV dataset preprocessing')
+    parser.add_argument('--engine', choices=['sklearn', 'compiled'], default='sklearn',
+                        help='Engine predict pembanding (default: sklearn)')
+    parser.add_argument('--batch-sizes', type=int, nargs='*', default=[1, 8, 64, 512, 4096])
+    parser.add_argument('--repeats', type=int, default=7, help='Pengulangan timing (default: 7)')
+    args = parser.parse_args()
+
+    model_path = args.model_uri or (find_model_artifact_path(args.run_id) if args.run_id else None)
+    if not model_path:
+        print("ERROR: Berikan --model-uri atau --run-id yang punya model artifact")
+        return 1
+
+    forest = load_sklearn_model(model_path)
+    if args.engine == 'compiled':
+        forest = CompiledForest.from_sklearn(forest)
+
+    start = time.perf_counter()
+    explainer = SaabasExplainer.from_model(forest)
+    build_seconds = time.perf_counter() - start
+
+    rows = load_replay_rows(args.data, max_rows=None)
+
+    print("=" * 70)
+    print("BENCHMARK EXPLAIN (SAABAS) VS PREDICT")
+    print("=" * 70)
+    print(f"Model   : {model_path} ({args.engine}, {forest.n_estimators} trees)")
+    print(f"Data    : {args.data} ({len(rows)} rows)")
+    print(f"Precompute nilai node: {build_seconds * 1000:.1f} ms")
+    print("-" * 70)
+    print(f"{'batch':>7}{'predict ms':>13}{'explain ms':>13}{'ratio':>9}{'max |err|':>13}")
+
+    for batch_size in args.batch_sizes:
+        reps = int(np.ceil(batch_size / len(rows)))
+        X = np.ascontiguousarray(np.tile(rows, (reps, 1))[:batch_size])
+
+        predict_s = time_call(forest.predict_proba, X, args.repeats)
+        explain_s = time_call(explainer.explain, X, args.repeats)
+        proba, _ = explainer.explain(X)
+        error = float(np.abs(proba - forest.predict_proba(X)).max())
+        print(f"{batch_size:>7}{predict_s * 1000:>13.2f}{explain_s * 1000:>13.2f}"
+              f"{explain_s / predict_s:>8.2f}x{error:>13.2e}")
+    print("=" * 70)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Benchmark throughput end-to-end per format payload /predict
+(JSON vs application/x-npy vs raw float32/float64)
+
+Waktu yang diukur mencakup encode di client, HTTP round trip, scoring
+dan decode response. Jalankan server terlebih dahulu:
+    python prometheus_exporter.py --model-uri <path model>
+    python benchmark_formats.py --rows 1000 --requests 50
+"""
+import io
+import json
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+import requests
+
+from forest_engine import default_data_path
+
+INFERENCE_URL = "http://127.0.0.1:5001/predict"
+
+
+def load_rows(data_path, n_rows):
+    """Ambil n_rows baris feature dari dataset preprocessing (diulang jika kurang)"""
+    df = pd.read_csv(data_path)
+    X = df.drop(columns=['quality_category'], errors='ignore').to_numpy(dtype=np.float64)
+    reps = int(np.ceil(n_rows / len(X)))
+    return np.ascontiguousarray(np.tile(X, (reps, 1))[:n_rows])
+
+
+def call_json(session, url, X):
+    response = session.post(url, json={'features': X.tolist()})
+    response.raise_for_status()
+    return np.asarray(response.json()['prediction'])
+
+
+def call_npy(session, url, X):
+    buffer = io.BytesIO()
+    np.save(buffer, X)
+    response = session.post(url, data=buffer.getvalue(),
+                            headers={'Content-Type': 'application/x-npy'})
+    response.raise_for_status()
+    return np.load(io.BytesIO(response.content))['prediction']
+
+
+def make_call_raw(dtype_name):
+    dtype = np.dtype('<f4') if dtype_name == 'float32' else np.dtype('<f8')
+
+    def call_raw(session, url, X):
+        response = session.post(url, data=X.astype(dtype).tobytes(), headers={
+            'Content-Type': 'application/octet-stream',
+            'X-Shape': f"{X.shape[0]},{X.shape[1]}",
+            'X-Dtype': dtype_name,
+        })
+        response.raise_for_status()
+        shape = tuple(int(dim) for dim in response.headers['X-Shape'].split(','))
+        result = np.frombuffer(response.content, dtype='<f8').reshape(shape)
+        # Kolom 0 = index kelas; label-nya ada di header X-Classes
+        classes = response.headers.get('X-Classes')
+        if classes is None:
+            return result[:, 0]
+        return np.asarray(json.loads(classes)).take(result[:, 0].astype(np.int64))
+    return call_raw
+
+
+FORMATS = {
+    'json': call_json,
+    'npy': call_npy,
+    'raw-float32': make_call_raw('float32'),
+    'raw-float64': make_call_raw('float64'),
+}
+
+
+def benchmark(call, url, X, n_requests, warmup=3):
+    with requests.Session() as session:
+        for _ in range(warmup):
+            call(session, url, X)
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(n_requests):
+            t0 = time.perf_counter()
+            preds = call(session, url, X)
+            latencies.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - start
+    assert len(preds) == len(X)
+    return {
+        'rows_per_sec': n_requests * len(X) / elapsed,
+        'p50_ms': float(np.percentile(latencies, 50) * 1000),
+        'p99_ms': float(np.percentile(latencies, 99) * 1000),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark format payload /predict')
+    parser.add_argument('--url', default=INFERENCE_URL, help=f'Endpoint predict (default: {INFERENCE_URL})')
+    parser.add_argument('--data', default=default_data_path(), help='CSV dataset preprocessing')
+    parser.add_argument('--rows', type=int, default=1000, help='Baris per request (default: 1000)')
+    parser.add_argument('--requests', type=int, default=50, help='Jumlah request per format (default: 50)')
+    parser.add_argument('--formats', nargs='+', default=list(FORMATS), choices=list(FORMATS))
+    args = parser.parse_args()
+
+    X = load_rows(args.data, args.rows)
+
+    print("=" * 60)
+    print("BENCHMARK FORMAT PAYLOAD /predict")
+    print("=" * 60)
+    print(f"URL      : {args.url}")
+    print(f"Batch    : {args.rows} rows x {X.shape[1]} features, {args.requests} requests")
+    print("-" * 60)
+    print(f"{'format':<14}{'rows/sec':>14}{'p50 ms':>12}{'p99 ms':>12}")
+
+    results = {}
+    for name in args.formats:
+        results[name] = benchmark(FORMATS[name], args.url, X, args.requests)
+        r = results[name]
+        print(f"{name:<14}{r['rows_per_sec']:>14,.0f}{r['p50_ms']:>12.2f}{r['p99_ms']:>12.2f}")
+
+    if 'json' in results:
+        print("-" * 60)
+        for name, r in results.items():
+            if name != 'json':
+                speedup = r['rows_per_sec'] / results['json']['rows_per_sec']
+                print(f"{name} vs json: {speedup:.2f}x")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
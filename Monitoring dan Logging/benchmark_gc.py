@@ -0,0 +1,164 @@
+"""
+Load test tail latency /predict dengan dan tanpa --gc-freeze
+Konfigurasi: default dan freeze; jika --gc-threshold diberikan juga
+threshold saja dan freeze+threshold, sehingga efek freeze dan threshold
+terlihat terpisah. Untuk setiap konfigurasi server dijalankan sebagai
+subprocess, ditunggu sampai /ready, lalu dibebani oleh beberapa client thread selama durasi
+tertentu. Dilaporkan throughput, p50/p99/p99.9 latensi client serta jumlah
+koleksi dan total pause GC per generasi dari /metrics (gc_pause_seconds).
+
+Penggunaan:
+    python benchmark_gc.py --model-uri <path model>
+    python benchmark_gc.py --model-uri <path model> --duration 60 --gc-threshold 50000 20 20
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+import subprocess
+
+import numpy as np
+import requests
+from prometheus_client.parser import text_string_to_metric_families
+
+from forest_engine import default_data_path
+from warmup import load_replay_rows
+
+INFERENCE_URL = "http://127.0.0.1:5001"
+METRICS_URL = "http://127.0.0.1:8000/metrics"
+
+
+def start_server(model_uri, extra_args, timeout=120.0):
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, MLFLOW_DISABLE_AGENT_HINT='1', PYTHONWARNINGS='ignore')
+    proc = subprocess.Popen(
+        [sys.executable, 'prometheus_exporter.py', '--model-uri', model_uri] + extra_args,
+        cwd=script_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"Server exited with code {proc.returncode}")
+        try:
+            if requests.get(f"{INFERENCE_URL}/ready", timeout=1).status_code == 200:
+                return proc
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.5)
+    proc.terminate()
+    raise RuntimeError("Server not ready before timeout")
+
+
+def stop_server(proc):
+    proc.terminate()
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def gc_pauses():
+    """{generation: (jumlah koleksi, total pause detik)} dari /metrics"""
+    text = requests.get(METRICS_URL, timeout=5).text
+    result = {}
+    for family in text_string_to_metric_families(text):
+        if family.name != 'gc_pause_seconds':
+            continue
+        for sample in family.samples:
+            generation = sample.labels['generation']
+            count, total = result.get(generation, (0.0, 0.0))
+            if sample.name.endswith('_count'):
+                count = sample.value
+            elif sample.name.endswith('_sum'):
+                total = sample.value
+            result[generation] = (count, total)
+    return result
+
+
+def run_load(payloads, duration, concurrency):
+    """Latensi (detik) semua request sukses dari `concurrency` client selama `duration` detik"""
+    latencies = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    stop_at = time.monotonic() + duration
+
+    def client(index):
+        session = requests.Session()
+        i = index
+        while time.monotonic() < stop_at:
+            start = time.perf_counter()
+            response = session.post(f"{INFERENCE_URL}/predict", json=payloads[i % len(payloads)])
+            elapsed = time.perf_counter() - start
+            if response.status_code == 200:
+                latencies[index].append(elapsed)
+            else:
+                errors[index] += 1
+            i += concurrency
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return np.concatenate([np.asarray(l) for l in latencies]), sum(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test p99 /predict dengan dan tanpa --gc-freeze')
+    parser.add_argument('--model-uri', required=True, help='Path model yang dilayani')
+    parser.add_argument('--data', default=default_data_path(), help='CSV dataset preprocessing')
+    parser.add_argument('--duration', type=float, default=30.0, help='Durasi beban per konfigurasi (default: 30)')
+    parser.add_argument('--concurrency', type=int, default=4, help='Jumlah client thread (default: 4)')
+    parser.add_argument('--rows', type=int, default=16, help='Baris per request (default: 16)')
+    parser.add_argument('--gc-threshold', type=int, nargs='+', default=None,
+                        help='Tambah konfigurasi "threshold" dan "freeze+threshold" dengan nilai ini')
+    parser.add_argument('--server-args', nargs=argparse.REMAINDER, default=[],
+                        help='Argumen tambahan untuk semua server (taruh paling akhir)')
+    args = parser.parse_args()
+
+    rows = load_replay_rows(args.data, max_rows=None)
+    payloads = [{'features': rows[start:start + args.rows].tolist()}
+                for start in range(0, len(rows) - args.rows + 1, args.rows)]
+
+    configs = [('default', []), ('freeze', ['--gc-freeze'])]
+    if args.gc_threshold:
+        threshold_args = ['--gc-threshold'] + [str(v) for v in args.gc_threshold]
+        configs = [('default', []), ('threshold', threshold_args),
+                   ('freeze', ['--gc-freeze']), ('freeze+threshold', ['--gc-freeze'] + threshold_args)]
+
+    print("=" * 78)
+    print("LOAD TEST GC: TAIL LATENCY /predict")
+    print("=" * 78)
+    print(f"Model   : {args.model_uri}")
+    print(f"Beban   : {args.concurrency} client x {args.duration:g}s, {args.rows} rows/request")
+    if args.gc_threshold:
+        print(f"Threshold: {' '.join(str(v) for v in args.gc_threshold)}")
+    print("-" * 78)
+    print(f"{'config':<18}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'p99.9 ms':>10}{'max ms':>9}"
+          f"{'errors':>8}  gc gen0/1/2 (n; total pause ms)")
+
+    for name, config_args in configs:
+        proc = start_server(args.model_uri, config_args + args.server_args)
+        try:
+            before = gc_pauses()
+            latencies, errors = run_load(payloads, args.duration, args.concurrency)
+            after = gc_pauses()
+        finally:
+            stop_server(proc)
+
+        counts, totals = [], []
+        for generation in ('0', '1', '2'):
+            count_after, total_after = after.get(generation, (0.0, 0.0))
+            count_before, total_before = before.get(generation, (0.0, 0.0))
+            counts.append(f"{count_after - count_before:.0f}")
+            totals.append(f"{(total_after - total_before) * 1000:.1f}")
+        p50, p99, p999 = np.percentile(latencies, [50, 99, 99.9]) * 1000
+        print(f"{name:<18}{len(latencies) / args.duration:>9.1f}{p50:>9.2f}{p99:>9.2f}{p999:>10.2f}"
+              f"{latencies.max() * 1000:>9.2f}{errors:>8}  {'/'.join(counts)}; {'/'.join(totals)}")
+    print("=" * 78)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
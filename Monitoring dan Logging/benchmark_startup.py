@@ -0,0 +1,79 @@
+"""
+Benchmark cold start server inference: lean loader vs MLflow
+Setiap percobaan berjalan di interpreter baru (subprocess) supaya import
+benar-benar dingin. Waktu dilaporkan terpisah untuk import modul server,
+load model dan prediksi pertama.
+
+Penggunaan:
+    python benchmark_startup.py --model-uri <path model> --repeat 5
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+import numpy as np
+
+# Dijalankan di child process; hasil dicetak sebagai JSON di baris terakhir
+_CHILD_CODE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import prometheus_exporter as exporter
+if sys.argv[2] == 'mlflow':
+    import mlflow.sklearn
+t1 = time.perf_counter()
+model = exporter.build_model(sys.argv[1], loader=sys.argv[2])
+t2 = time.perf_counter()
+import numpy as np
+X = np.zeros((1, model.n_features_in_))
+model.predict_proba(X)
+t3 = time.perf_counter()
+print(json.dumps({'import': t1 - t0, 'load': t2 - t1, 'first_predict': t3 - t2}))
+"""
+
+PHASES = ('import', 'load', 'first_predict')
+
+
+def run_once(model_uri, loader):
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, MLFLOW_DISABLE_AGENT_HINT='1', PYTHONWARNINGS='ignore')
+    result = subprocess.run(
+        [sys.executable, '-c', _CHILD_CODE, model_uri, loader],
+        cwd=script_dir, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark cold start: lean loader vs MLflow')
+    parser.add_argument('--model-uri', required=True, help='Folder model MLflow lokal')
+    parser.add_argument('--repeat', type=int, default=5, help='Jumlah cold start per loader (default: 5)')
+    parser.add_argument('--loaders', nargs='+', default=['lean', 'mlflow'], choices=['lean', 'mlflow'])
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("BENCHMARK COLD START")
+    print("=" * 60)
+    print(f"Model  : {args.model_uri}")
+    print(f"Repeat : {args.repeat} (median)")
+    print("-" * 60)
+    print(f"{'loader':<10}" + ''.join(f"{phase + ' s':>16}" for phase in PHASES) + f"{'total s':>10}")
+
+    medians = {}
+    for loader in args.loaders:
+        runs = [run_once(args.model_uri, loader) for _ in range(args.repeat)]
+        medians[loader] = {phase: float(np.median([r[phase] for r in runs])) for phase in PHASES}
+        total = sum(medians[loader].values())
+        print(f"{loader:<10}" + ''.join(f"{medians[loader][phase]:>16.3f}" for phase in PHASES)
+              + f"{total:>10.3f}")
+
+    if 'lean' in medians and 'mlflow' in medians:
+        print("-" * 60)
+        speedup = sum(medians['mlflow'].values()) / sum(medians['lean'].values())
+        print(f"lean vs mlflow: {speedup:.2f}x faster to first prediction")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Early-exit inference untuk RandomForest
+Tree dievaluasi per blok dengan urutan tetap. Setelah setiap blok, baris yang
+hasil vote-nya sudah pasti (selisih kelas teratas dan kedua lebih besar dari
+jumlah tree yang tersisa, karena satu tree paling banyak menambah 1.0 ke
+satu kelas) atau sudah mencapai margin keyakinan yang ditentukan, berhenti
+dievaluasi. Tanpa margin, prediksi selalu identik dengan forest penuh;
+probabilitas baris yang berhenti lebih awal adalah rata-rata tree yang
+sudah dievaluasi.
+
+Bisa membungkus RandomForestClassifier sklearn maupun CompiledForest.
+"""
+import numpy as np
+
+from forest_engine import CompiledForest
+
+
+class EarlyExitForest:
+    """
+    Parameters:
+    -----------
+    forest : RandomForestClassifier atau CompiledForest
+    block_size : int
+        Jumlah tree per blok sebelum keputusan berhenti dicek
+    margin : float, optional
+        Berhenti juga jika (proba kelas teratas - kelas kedua) rata-rata
+        tree yang sudah dievaluasi >= margin (boleh mengubah sebagian kecil prediksi)
+    min_trees : int
+        Jumlah tree minimum sebelum margin boleh dipakai
+    trees_histogram : prometheus_client.Histogram, optional
+        Rata-rata jumlah tree yang dievaluasi per baris, satu observasi per panggilan
+    """
+
+    def __init__(self, forest, block_size=8, margin=None, min_trees=16, trees_histogram=None):
+        if block_size < 1:
+            raise ValueError("block_size must be >= 1")
+        self.forest = forest
+        self.block_size = block_size
+        self.margin = margin
+        self.min_trees = min_trees
+        self.trees_histogram = trees_histogram
+
+        self.classes_ = np.asarray(forest.classes_)
+        self.n_features_in_ = forest.n_features_in_
+        if isinstance(forest, CompiledForest):
+            self.n_estimators = forest.n_estimators
+            self._estimators = None
+        else:
+            estimators = getattr(forest, 'estimators_', None)
+            if not estimators or getattr(forest, 'n_outputs_', 1) != 1:
+                raise ValueError("Early exit requires a fitted single-output tree ensemble")
+            self.n_estimators = len(estimators)
+            self._estimators = estimators
+
+    def _block_proba(self, X, start, stop):
+        """Jumlah distribusi kelas tree [start, stop) untuk X float32"""
+        if self._estimators is None:
+            leaves = self.forest._apply(X, roots=self.forest.roots[start:stop])
+            return self.forest.value[leaves].sum(axis=1)
+        total = self._estimators[start].predict_proba(X, check_input=False)
+        for est in self._estimators[start + 1:stop]:
+            total += est.predict_proba(X, check_input=False)
+        return total
+
+    def predict_proba_with_counts(self, X):
+        """
+        Returns:
+        --------
+        proba : np.ndarray (n_rows, n_classes)
+        n_trees : np.ndarray (n_rows,) jumlah tree yang dievaluasi per baris
+        """
+        # Cast float32 yang sama dengan sklearn/CompiledForest agar split identik
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        n_rows = X.shape[0]
+        n_classes = len(self.classes_)
+        total_trees = self.n_estimators
+
+        sums = np.zeros((n_rows, n_classes), dtype=np.float64)
+        n_trees = np.zeros(n_rows, dtype=np.int64)
+        active = np.arange(n_rows)
+
+        for start in range(0, total_trees, self.block_size):
+            stop = min(start + self.block_size, total_trees)
+            sums[active] += self._block_proba(X[active], start, stop)
+            n_trees[active] = stop
+            if stop == total_trees or n_classes < 2:
+                break
+
+            top2 = np.partition(sums[active], -2, axis=1)[:, -2:]
+            lead = top2[:, 1] - top2[:, 0]
+            # Tree tersisa tidak bisa lagi mengubah argmax
+            done = lead > (total_trees - stop)
+            if self.margin is not None and stop >= self.min_trees:
+                done |= lead / stop >= self.margin
+            active = active[~done]
+            if not active.size:
+                break
+
+        proba = sums / n_trees[:, None]
+        if self.trees_histogram is not None and n_rows:
+            self.trees_histogram.observe(float(n_trees.mean()))
+        return proba, n_trees
+
+    def predict_proba(self, X):
+        return self.predict_proba_with_counts(X)[0]
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
@@ -0,0 +1,96 @@
+"""
+Evaluasi offline early-exit inference pada dataset preprocessing
+Untuk setiap konfigurasi (margin) dilaporkan agreement prediksi terhadap
+forest penuh, rata-rata jumlah tree yang dievaluasi per baris, serta latensi
+batch penuh dan latensi per baris dibanding forest penuh.
+
+Penggunaan:
+    python evaluate_early_exit.py --model-uri <path model>
+    python evaluate_early_exit.py --run-id <run_id> --margins 0.2 0.4 --engine compiled
+"""
+import sys
+import time
+import argparse
+
+import numpy as np
+
+from early_exit import EarlyExitForest
+from forest_engine import CompiledForest, default_data_path, load_sklearn_model
+from serve_model_direct import find_model_artifact_path
+from warmup import load_replay_rows
+
+
+def time_call(fn, X, repeats):
+    """Median detik per panggilan fn(X)"""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples))
+
+
+def time_per_row(fn, X, n_rows):
+    """Rata-rata detik untuk prediksi satu baris (n_rows baris pertama)"""
+    start = time.perf_counter()
+    for i in range(n_rows):
+        fn(X[i:i + 1])
+    return (time.perf_counter() - start) / n_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Evaluasi early-exit RandomForest inference')
+    parser.add_argument('--run-id', type=str, help='MLflow run ID')
+    parser.add_argument('--model-uri', type=str, help='Path model langsung (alternatif --run-id)')
+    parser.add_argument('--data', default=default_data_path(), help='CSV dataset preprocessing')
+    parser.add_argument('--engine', choices=['sklearn', 'compiled'], default='sklearn')
+    parser.add_argument('--block-size', type=int, default=8, help='Tree per blok (default: 8)')
+    parser.add_argument('--margins', type=float, nargs='*', default=[0.1, 0.2, 0.3, 0.5],
+                        help='Margin keyakinan yang dievaluasi selain mode exact')
+    parser.add_argument('--repeats', type=int, default=5, help='Pengulangan timing batch (default: 5)')
+    parser.add_argument('--single-rows', type=int, default=200,
+                        help='Jumlah baris untuk timing per baris (default: 200)')
+    args = parser.parse_args()
+
+    model_path = args.model_uri or (find_model_artifact_path(args.run_id) if args.run_id else None)
+    if not model_path:
+        print("ERROR: Berikan --model-uri atau --run-id yang punya model artifact")
+        return 1
+
+    forest = load_sklearn_model(model_path)
+    if args.engine == 'compiled':
+        forest = CompiledForest.from_sklearn(forest)
+    X = load_replay_rows(args.data, max_rows=None)
+    n_single = min(args.single_rows, len(X))
+
+    full_preds = forest.predict(X)
+    full_batch = time_call(forest.predict_proba, X, args.repeats)
+    full_row = time_per_row(forest.predict_proba, X, n_single)
+    n_estimators = forest.n_estimators
+
+    print("=" * 78)
+    print("EVALUASI EARLY-EXIT INFERENCE")
+    print("=" * 78)
+    print(f"Model   : {model_path} ({args.engine}, {n_estimators} trees)")
+    print(f"Data    : {args.data} ({len(X)} rows)")
+    print(f"Full    : batch {full_batch * 1000:.1f} ms, single row {full_row * 1000:.2f} ms")
+    print("-" * 78)
+    print(f"{'mode':<14}{'agreement':>11}{'mean trees':>12}{'batch ms':>11}{'speedup':>9}"
+          f"{'row ms':>10}{'speedup':>9}")
+
+    for margin in [None] + list(args.margins):
+        model = EarlyExitForest(forest, block_size=args.block_size, margin=margin)
+        proba, n_trees = model.predict_proba_with_counts(X)
+        preds = model.classes_.take(np.argmax(proba, axis=1))
+        agreement = float(np.mean(preds == full_preds))
+        batch = time_call(model.predict_proba, X, args.repeats)
+        row = time_per_row(model.predict_proba, X, n_single)
+        name = 'exact' if margin is None else f"margin {margin:g}"
+        print(f"{name:<14}{agreement:>10.2%}{n_trees.mean():>12.1f}{batch * 1000:>11.1f}"
+              f"{full_batch / batch:>8.2f}x{row * 1000:>10.2f}{full_row / row:>8.2f}x")
+    print("=" * 78)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
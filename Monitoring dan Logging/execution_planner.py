@@ -0,0 +1,180 @@
+"""
+Execution planner untuk inference RandomForest berdasarkan ukuran batch
+Setiap panggilan predict_proba memilih salah satu strategi:
+
+- single        : satu thread, semua tree berurutan (terbaik untuk batch kecil)
+- tree_parallel : tree dibagi ke worker pool, hasil tiap kelompok dijumlahkan
+- row_chunk     : baris dibagi ke worker pool, setiap worker memakai semua tree
+
+Traversal tree sklearn berjalan tanpa GIL, sehingga thread pool cukup.
+Batas ukuran batch untuk tiap strategi dikalibrasi saat startup dengan
+microbenchmark singkat pada model yang dilayani.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+SINGLE = 'single'
+TREE_PARALLEL = 'tree_parallel'
+ROW_CHUNK = 'row_chunk'
+
+
+def _forest_estimators(model):
+    """List tree sklearn jika model adalah forest single-output, selain itu None"""
+    estimators = getattr(model, 'estimators_', None)
+    if not estimators or getattr(model, 'n_outputs_', 1) != 1:
+        return None
+    return estimators
+
+
+def _sum_tree_proba(estimators, X):
+    """Jumlah predict_proba semua tree (X sudah float32 contiguous, seperti di sklearn)"""
+    total = estimators[0].predict_proba(X, check_input=False)
+    for est in estimators[1:]:
+        total += est.predict_proba(X, check_input=False)
+    return total
+
+
+class ExecutionPlanner:
+    """
+    Parameters:
+    -----------
+    workers : int
+        Ukuran worker pool persisten untuk strategi paralel
+    plan_counter : prometheus_client.Counter, optional
+        Counter dengan label 'strategy'
+    plan_histogram : prometheus_client.Histogram, optional
+        Histogram durasi predict_proba dengan label 'strategy'
+    calibration_gauge : prometheus_client.Gauge, optional
+        Hasil kalibrasi dengan label 'strategy' dan 'batch_size' (detik per panggilan)
+    """
+
+    def __init__(self, workers=None, plan_counter=None, plan_histogram=None, calibration_gauge=None):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.plan_counter = plan_counter
+        self.plan_histogram = plan_histogram
+        self.calibration_gauge = calibration_gauge
+        # [(batch_size minimum, strategi)] urut naik; default: selalu single
+        self.plan = [(1, SINGLE)]
+        self._pool = None
+        self._pool_pid = None
+
+    # --------------------------------------------
+    # WORKER POOL
+    # --------------------------------------------
+    def _executor(self):
+        # Thread tidak ikut ter-fork (serve_prefork.py), jadi pool dibuat ulang per proses
+        if self._pool is None or self._pool_pid != os.getpid():
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='planner')
+            self._pool_pid = os.getpid()
+        return self._pool
+
+    # --------------------------------------------
+    # STRATEGI
+    # --------------------------------------------
+    def strategies(self, model):
+        """Strategi yang bisa dipakai untuk model ini"""
+        if self.workers == 1:
+            return [SINGLE]
+        if _forest_estimators(model) is not None:
+            return [SINGLE, TREE_PARALLEL, ROW_CHUNK]
+        return [SINGLE, ROW_CHUNK]
+
+    def _run(self, strategy, model, X):
+        estimators = _forest_estimators(model)
+        if estimators is None:
+            if strategy == SINGLE:
+                return model.predict_proba(X)
+            chunks = np.array_split(X, min(self.workers, len(X)))
+            return np.concatenate(list(self._executor().map(model.predict_proba, chunks)))
+
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if strategy == SINGLE:
+            proba = _sum_tree_proba(estimators, X)
+        elif strategy == TREE_PARALLEL:
+            # Worker lebih banyak dari tree: kelompok kosong tidak boleh dibuat
+            n_groups = min(self.workers, len(estimators))
+            groups = [estimators[i::n_groups] for i in range(n_groups)]
+            parts = self._executor().map(lambda group: _sum_tree_proba(group, X), groups)
+            proba = sum(parts)
+        else:
+            chunks = np.array_split(X, min(self.workers, len(X)))
+            parts = self._executor().map(lambda chunk: _sum_tree_proba(estimators, chunk), chunks)
+            proba = np.concatenate(list(parts))
+        proba /= len(estimators)
+        return proba
+
+    def choose(self, n_rows, model=None):
+        """Strategi untuk batch n_rows baris menurut hasil kalibrasi"""
+        strategy = SINGLE
+        for min_rows, planned in self.plan:
+            if n_rows >= min_rows:
+                strategy = planned
+        if model is not None and strategy not in self.strategies(model):
+            return SINGLE
+        return strategy
+
+    def predict_proba(self, model, X):
+        strategy = self.choose(X.shape[0], model)
+        start = time.perf_counter()
+        proba = self._run(strategy, model, X)
+        if self.plan_counter is not None:
+            self.plan_counter.labels(strategy=strategy).inc()
+        if self.plan_histogram is not None:
+            self.plan_histogram.labels(strategy=strategy).observe(time.perf_counter() - start)
+        return proba
+
+    # --------------------------------------------
+    # KALIBRASI
+    # --------------------------------------------
+    def calibrate(self, model, batch_sizes=(1, 8, 64, 512, 4096), repeats=5, min_speedup=1.1, seed=0):
+        """
+        Ukur setiap strategi pada setiap ukuran batch dan simpan strategi tercepat
+        Strategi paralel hanya dipilih jika minimal `min_speedup` kali lebih cepat
+        dari single, karena di bawah beban concurrent worker pool ikut diperebutkan
+
+        Returns:
+        --------
+        dict : {batch_size: {strategi: median detik per panggilan}}
+        """
+        n_features = model.n_features_in_
+        rng = np.random.default_rng(seed)
+        strategies = self.strategies(model)
+        results = {}
+        plan = []
+
+        for batch_size in batch_sizes:
+            X = rng.standard_normal((batch_size, n_features))
+            timings = {}
+            for strategy in strategies:
+                self._run(strategy, model, X)  # warmup pool dan cache
+                samples = []
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    self._run(strategy, model, X)
+                    samples.append(time.perf_counter() - start)
+                timings[strategy] = float(np.median(samples))
+                if self.calibration_gauge is not None:
+                    self.calibration_gauge.labels(strategy=strategy, batch_size=str(batch_size)).set(
+                        timings[strategy])
+            results[batch_size] = timings
+            best = min(timings, key=timings.get)
+            if best != SINGLE and timings[SINGLE] < timings[best] * min_speedup:
+                best = SINGLE
+            if not plan or plan[-1][1] != best:
+                plan.append((batch_size, best))
+
+        # Batch yang lebih kecil dari ukuran kalibrasi terkecil ikut strategi pertama
+        if plan:
+            plan[0] = (1, plan[0][1])
+            self.plan = plan
+        return results
+
+    def describe(self):
+        """Ringkasan plan, mis. 'single / 512 <= row_chunk'"""
+        parts = []
+        for min_rows, strategy in self.plan:
+            parts.append(strategy if not parts else f"{min_rows} <= {strategy}")
+        return ' / '.join(parts)
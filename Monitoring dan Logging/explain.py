@@ -0,0 +1,101 @@
+"""
+Feature attribution Saabas untuk RandomForest
+Kontribusi feature f pada satu tree = jumlah perubahan distribusi kelas
+(nilai node anak - nilai node induk) di sepanjang decision path pada split
+yang memakai f. Dirata-rata ke semua tree:
+
+    predict_proba(x) = bias + sum_f contribution[x, f]
+
+dengan bias = rata-rata distribusi kelas di root. Selisih nilai setiap node
+terhadap induknya dihitung sekali saat model di-load, lalu path semua
+(baris, tree) ditelusuri bersamaan seperti CompiledForest._apply.
+"""
+import numpy as np
+
+from forest_engine import CompiledForest
+
+
+class SaabasExplainer:
+    """
+    Parameters:
+    -----------
+    forest : CompiledForest
+    feature_names : list of str, optional
+    """
+
+    def __init__(self, forest, feature_names=None):
+        self.forest = forest
+        self.classes_ = forest.classes_
+        self.n_features_in_ = forest.n_features_in_
+        self.feature_names = (list(feature_names) if feature_names is not None
+                              else [f"f{i}" for i in range(forest.n_features_in_)])
+
+        # Induk setiap node (root dan leaf yang menunjuk dirinya sendiri tidak dihitung)
+        n_nodes = len(forest.feature)
+        children = np.asarray(forest.children)
+        internal = ~forest._is_leaf
+        parent = np.arange(n_nodes)
+        parent[children[internal, 0]] = np.flatnonzero(internal)
+        parent[children[internal, 1]] = np.flatnonzero(internal)
+
+        # delta[node] = value[node] - value[induk]; root = 0
+        value = np.asarray(forest.value)
+        self.node_delta = value - value[parent]
+        self.bias = value[np.asarray(forest.roots)].mean(axis=0)
+
+    @classmethod
+    def from_model(cls, model):
+        """Explainer untuk forest sklearn, CompiledForest atau EarlyExitForest"""
+        feature_names = getattr(model, 'feature_names_in_', None)
+        forest = getattr(model, 'forest', model)  # EarlyExitForest membungkus forest
+        if feature_names is None:
+            feature_names = getattr(forest, 'feature_names_in_', None)
+        if not isinstance(forest, CompiledForest):
+            forest = CompiledForest.from_sklearn(forest)
+        return cls(forest, feature_names)
+
+    def explain(self, X):
+        """
+        Returns:
+        --------
+        proba : np.ndarray (n_rows, n_classes)
+            Sama dengan predict_proba forest (bias + jumlah kontribusi)
+        contributions : np.ndarray (n_rows, n_features, n_classes)
+        """
+        forest = self.forest
+        X = forest._as_input(X)
+        n_rows = X.shape[0]
+        contributions = np.empty((n_rows, self.n_features_in_, len(self.classes_)), dtype=np.float64)
+        for start in range(0, n_rows, forest.chunk_size):
+            end = min(start + forest.chunk_size, n_rows)
+            contributions[start:end] = self._contributions(X[start:end])
+        proba = self.bias + contributions.sum(axis=1)
+        return proba, contributions
+
+    def _contributions(self, X):
+        forest = self.forest
+        n_rows, n_features = X.shape
+        n_trees = forest.n_estimators
+        n_classes = len(self.classes_)
+        X_flat = X.reshape(-1)
+
+        totals = np.zeros((n_classes, n_rows * n_features), dtype=np.float64)
+        node = np.tile(forest.roots, n_rows)
+        row_offset = np.repeat(np.arange(n_rows) * n_features, n_trees)
+
+        while node.size:
+            target = row_offset + forest.feature[node]
+            go_right = X_flat[target] > forest.threshold[node]
+            child = forest._children_flat[2 * node + go_right]
+
+            # Perubahan distribusi kelas di edge ini masuk ke feature split-nya
+            delta = self.node_delta[child]
+            for c in range(n_classes):
+                totals[c] += np.bincount(target, weights=delta[:, c], minlength=n_rows * n_features)
+
+            keep = ~forest._is_leaf[child]
+            node = child[keep]
+            row_offset = row_offset[keep]
+
+        totals /= n_trees
+        return totals.reshape(n_classes, n_rows, n_features).transpose(1, 2, 0)
@@ -0,0 +1,296 @@
+"""
+Compiled RandomForest engine untuk inference latency rendah
+Forest sklearn yang sudah di-fit dipack menjadi array NumPy datar
+(feature, threshold, children, distribusi kelas di leaf) lalu dievaluasi
+untuk semua tree sekaligus tanpa validasi input dan dispatch per-tree sklearn
+
+Penggunaan:
+    python forest_engine.py export --model-uri <path model> --output <folder>
+    python forest_engine.py verify --model-uri <path model> --compiled <folder>
+"""
+import os
+import sys
+import json
+import argparse
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+# Nama file array di folder hasil export
+_ARRAY_FILES = ('feature', 'threshold', 'children', 'value', 'roots')
+
+
+class CompiledForest:
+    """
+    RandomForestClassifier dalam bentuk array datar
+
+    Semua node dari semua tree digabung ke satu array. children[node] berisi
+    (anak kiri, anak kanan) dengan index global; leaf menunjuk ke dirinya sendiri
+    sehingga traversal semua (baris, tree) bisa berjalan bersamaan dan pasangan
+    yang sudah sampai leaf langsung dikeluarkan dari active set.
+    Interface-nya mengikuti classifier sklearn (predict, predict_proba,
+    classes_, n_features_in_) agar bisa langsung dipakai oleh server.
+    """
+
+    def __init__(self, feature, threshold, children, value, roots, max_depth,
+                 classes, n_features, chunk_size=2048):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes_ = np.asarray(classes)
+        self.n_features_in_ = int(n_features)
+        self.n_estimators = len(roots)
+        # Batch besar dipecah agar array (rows, trees, classes) tidak membengkak
+        self.chunk_size = chunk_size
+
+        # children.ravel()[2 * node + go_right] = anak berikutnya (view, aman untuk mmap)
+        self._children_flat = children.reshape(-1)
+        self._is_leaf = children[:, 0] == np.arange(len(children), dtype=children.dtype)
+
+    # --------------------------------------------
+    # EXPORT DARI SKLEARN
+    # --------------------------------------------
+    @classmethod
+    def from_sklearn(cls, forest):
+        """Pack RandomForestClassifier (atau ensemble tree sejenis) ke array datar"""
+        estimators = getattr(forest, 'estimators_', None)
+        if not estimators:
+            raise ValueError("Model is not a fitted tree ensemble (no estimators_)")
+        if getattr(forest, 'n_outputs_', 1) != 1:
+            raise ValueError("Multi-output forests are not supported")
+
+        n_classes = len(forest.classes_)
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for est in estimators:
+            tree = est.tree_
+            n_nodes = tree.node_count
+            idx = np.arange(n_nodes, dtype=np.int32)
+            is_leaf = tree.children_left == -1
+
+            left = np.where(is_leaf, idx, tree.children_left).astype(np.int32) + offset
+            right = np.where(is_leaf, idx, tree.children_right).astype(np.int32) + offset
+            node_children = np.stack([left, right], axis=1)
+            # Leaf tidak punya feature (-2 di sklearn), isi 0 supaya aman untuk indexing
+            feature = np.where(is_leaf, 0, tree.feature).astype(np.int32)
+
+            # value sklearn bisa berupa count atau fraksi tergantung versi, normalisasi per node
+            value = tree.value[:, 0, :n_classes].astype(np.float64)
+            totals = value.sum(axis=1, keepdims=True)
+            totals[totals == 0] = 1.0
+            value = value / totals
+
+            features.append(feature)
+            thresholds.append(tree.threshold.astype(np.float64))
+            children.append(node_children)
+            values.append(value)
+            roots.append(offset)
+
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            children=np.ascontiguousarray(np.concatenate(children)),
+            value=np.ascontiguousarray(np.concatenate(values)),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=max_depth,
+            classes=forest.classes_,
+            n_features=forest.n_features_in_,
+        )
+
+    # --------------------------------------------
+    # SAVE / LOAD
+    # --------------------------------------------
+    def save(self, path):
+        """Simpan array ke folder (satu file .npy per array + meta.json)"""
+        os.makedirs(path, exist_ok=True)
+        for name in _ARRAY_FILES:
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+        meta = {
+            'format_version': FORMAT_VERSION,
+            'max_depth': self.max_depth,
+            'n_features': self.n_features_in_,
+            'n_estimators': self.n_estimators,
+            'n_nodes': int(len(self.feature)),
+            'classes': self.classes_.tolist(),
+        }
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+
+    @classmethod
+    def load(cls, path, mmap_mode=None):
+        """Load forest hasil export; mmap_mode='r' untuk memory-map array"""
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        if meta.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compiled forest format: {meta.get('format_version')}")
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+            for name in _ARRAY_FILES
+        }
+        return cls(
+            max_depth=meta['max_depth'],
+            classes=meta['classes'],
+            n_features=meta['n_features'],
+            **arrays
+        )
+
+    # --------------------------------------------
+    # INFERENCE
+    # --------------------------------------------
+    def _as_input(self, X):
+        # sklearn membandingkan X dalam float32 terhadap threshold float64,
+        # jadi cast yang sama dibutuhkan untuk hasil yang identik
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected input with {self.n_features_in_} features, got shape {X.shape}")
+        if not np.isfinite(X).all():
+            raise ValueError("Input contains NaN or infinity")
+        return X
+
+    def apply(self, X):
+        """Index leaf (global) untuk setiap baris dan tree, shape (n_rows, n_trees)"""
+        X = self._as_input(X)
+        return self._apply(X)
+
+    def _apply(self, X, roots=None):
+        """Leaf untuk X yang sudah divalidasi; roots = subset tree (default: semua)"""
+        if roots is None:
+            roots = self.roots
+        n_rows, n_features = X.shape
+        n_trees = len(roots)
+        X_flat = X.reshape(-1)
+
+        # Satu entry per pasangan (baris, tree), urutan row-major
+        leaves = np.tile(roots, n_rows)
+        active = np.arange(n_rows * n_trees)
+        node = leaves
+        row_offset = np.repeat(np.arange(n_rows) * n_features, n_trees)
+
+        while active.size:
+            go_right = X_flat[row_offset + self.feature[node]] > self.threshold[node]
+            node = self._children_flat[2 * node + go_right]
+
+            done = self._is_leaf[node]
+            leaves[active[done]] = node[done]
+            keep = ~done
+            active = active[keep]
+            node = node[keep]
+            row_offset = row_offset[keep]
+
+        return leaves.reshape(n_rows, n_trees)
+
+    def predict_proba(self, X):
+        """Rata-rata distribusi kelas di leaf dari semua tree"""
+        X = self._as_input(X)
+        n_rows = X.shape[0]
+        proba = np.empty((n_rows, len(self.classes_)), dtype=np.float64)
+        for start in range(0, n_rows, self.chunk_size):
+            end = min(start + self.chunk_size, n_rows)
+            leaves = self._apply(X[start:end])
+            proba[start:end] = self.value[leaves].sum(axis=1)
+        proba /= self.n_estimators
+        return proba
+
+    def predict(self, X):
+        proba = self.predict_proba(X)
+        return self.classes_.take(np.argmax(proba, axis=1))
+
+
+# --------------------------------------------
+# CLI: EXPORT DAN PARITY CHECK
+# --------------------------------------------
+def default_data_path():
+    """Path default dataset preprocessing (Membangun_model/WineRed_preprocessing)"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(script_dir, '..', 'Membangun_model', 'WineRed_preprocessing',
+                        'winequality_preprocessed.csv')
+
+
+def load_sklearn_model(model_uri):
+    from model_loader import load_sklearn_model as load_model
+    return load_model(model_uri)
+
+
+def verify_parity(forest, compiled, data_path, atol=1e-9):
+    """
+    Bandingkan predict_proba sklearn dengan CompiledForest pada dataset CSV
+
+    Returns:
+    --------
+    max_abs_diff : float
+        Selisih absolut maksimum probabilitas
+    label_mismatch : int
+        Jumlah baris dengan prediksi kelas berbeda
+    """
+    import pandas as pd
+
+    df = pd.read_csv(data_path)
+    X = df.drop(columns=['quality_category'], errors='ignore')
+
+    expected = forest.predict_proba(X)
+    actual = compiled.predict_proba(X.to_numpy(dtype=np.float64))
+
+    max_abs_diff = float(np.max(np.abs(expected - actual)))
+    label_mismatch = int(np.sum(np.argmax(expected, axis=1) != np.argmax(actual, axis=1)))
+    print(f"Rows checked     : {len(X)}")
+    print(f"Max |proba diff| : {max_abs_diff:.3e}")
+    print(f"Label mismatches : {label_mismatch}")
+    return max_abs_diff, label_mismatch
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export dan verifikasi compiled RandomForest')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = sub.add_parser('export', help='Pack model sklearn ke array NumPy')
+    export_parser.add_argument('--model-uri', required=True, help='Path/URI model MLflow')
+    export_parser.add_argument('--output', required=True, help='Folder output compiled forest')
+
+    verify_parser = sub.add_parser('verify', help='Parity check terhadap sklearn predict_proba')
+    verify_parser.add_argument('--model-uri', required=True, help='Path/URI model MLflow')
+    verify_parser.add_argument('--compiled', help='Folder compiled forest (default: compile ulang)')
+    verify_parser.add_argument('--data', default=default_data_path(), help='CSV dataset preprocessing')
+    verify_parser.add_argument('--atol', type=float, default=1e-9, help='Toleransi selisih probabilitas')
+
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("COMPILED RANDOM FOREST")
+    print("=" * 60)
+
+    forest = load_sklearn_model(args.model_uri)
+
+    if args.command == 'export':
+        compiled = CompiledForest.from_sklearn(forest)
+        compiled.save(args.output)
+        print(f"Trees     : {compiled.n_estimators}")
+        print(f"Nodes     : {len(compiled.feature)}")
+        print(f"Max depth : {compiled.max_depth}")
+        print(f"Disimpan ke: {os.path.abspath(args.output)}")
+        return 0
+
+    if args.compiled:
+        compiled = CompiledForest.load(args.compiled)
+    else:
+        compiled = CompiledForest.from_sklearn(forest)
+    max_abs_diff, label_mismatch = verify_parity(forest, compiled, args.data)
+    if max_abs_diff > args.atol or label_mismatch:
+        print("PARITY CHECK GAGAL")
+        return 1
+    print("PARITY CHECK OK")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
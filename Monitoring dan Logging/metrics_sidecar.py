@@ -0,0 +1,57 @@
+"""
+Sidecar exporter untuk metrics shared-memory server inference
+Proses ini tidak meng-import server maupun model: ia hanya membaca file
+metrics mmap di PROMETHEUS_MULTIPROC_DIR (ditulis oleh proses server lewat
+prometheus_client multiprocess mode) dan me-render /metrics saat di-scrape.
+CPU/RSS/thread/FD proses server dibaca dari luar lewat psutil.
+Render teks dan GIL-nya sepenuhnya terpisah dari proses yang melayani /predict.
+
+Biasanya dijalankan otomatis oleh serve_shm_metrics.py. Manual:
+    python metrics_sidecar.py --multiproc-dir /dev/shm/model_server_metrics --server-pid <pid>
+"""
+import os
+import sys
+import time
+import argparse
+
+import psutil
+from prometheus_client import CollectorRegistry, multiprocess, start_http_server
+
+from process_collector import ProcessMetricsCollector
+
+
+def build_registry(multiproc_dir, server_pid=None):
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=multiproc_dir)
+    if server_pid is not None:
+        # Worker pre-fork (jika ada) adalah anak proses server
+        registry.register(ProcessMetricsCollector(include_children=True, pid=server_pid))
+    return registry
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sidecar /metrics untuk metrics shared-memory')
+    parser.add_argument('--multiproc-dir', type=str, default=os.environ.get('PROMETHEUS_MULTIPROC_DIR'),
+                        help='Folder file metrics mmap (default: $PROMETHEUS_MULTIPROC_DIR)')
+    parser.add_argument('--port', type=int, default=8000, help='Port /metrics (default: 8000)')
+    parser.add_argument('--server-pid', type=int, default=None,
+                        help='PID server inference; sidecar berhenti jika proses ini keluar')
+    args = parser.parse_args()
+
+    if not args.multiproc_dir or not os.path.isdir(args.multiproc_dir):
+        print("ERROR: --multiproc-dir (atau PROMETHEUS_MULTIPROC_DIR) harus folder yang ada")
+        return 1
+
+    start_http_server(args.port, registry=build_registry(args.multiproc_dir, args.server_pid))
+    print(f"Metrics sidecar: {args.multiproc_dir} -> http://127.0.0.1:{args.port}/metrics")
+
+    try:
+        while args.server_pid is None or psutil.pid_exists(args.server_pid):
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
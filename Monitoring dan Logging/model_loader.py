@@ -0,0 +1,82 @@
+"""
+Lean loader untuk model sklearn yang disimpan MLflow
+File MLmodel dibaca langsung dan artifact pickle/joblib di-load tanpa
+`import mlflow` (yang memakan waktu ~2 detik saat cold start). MLflow hanya
+di-import sebagai fallback untuk format yang tidak ditangani di sini (URI
+remote seperti runs:/ atau models:/, serialisasi skops, atau model dengan
+code path).
+
+Artifact .joblib di-load dengan mmap_mode sehingga array NumPy di dalamnya
+dibaca langsung dari page cache. Tree sklearn menyalin node-nya ke memori
+sendiri saat unpickle, jadi untuk RandomForest jalur mmap yang efektif adalah
+hasil export forest_engine.py (CompiledForest.load dengan mmap_mode='r').
+"""
+import os
+import pickle
+
+MLMODEL_FILE = 'MLmodel'
+
+
+class UnsupportedModelFormat(Exception):
+    """Model tidak bisa di-load oleh lean loader; gunakan MLflow"""
+
+
+def _local_path(model_uri):
+    if model_uri.startswith('file://'):
+        model_uri = model_uri[len('file://'):]
+    if '://' in model_uri or model_uri.startswith(('runs:/', 'models:/')):
+        raise UnsupportedModelFormat(f"non-local model URI: {model_uri}")
+    return model_uri
+
+
+def read_mlmodel(model_dir):
+    """Isi file MLmodel sebagai dict"""
+    import yaml
+    path = os.path.join(model_dir, MLMODEL_FILE)
+    if not os.path.exists(path):
+        raise UnsupportedModelFormat(f"{MLMODEL_FILE} not found in {model_dir}")
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+
+def load_lean(model_uri, mmap_mode='r'):
+    """
+    Load estimator sklearn dari folder model MLflow tanpa import mlflow
+
+    Raises:
+    -------
+    UnsupportedModelFormat : jika model harus di-load lewat MLflow
+    """
+    model_dir = _local_path(model_uri)
+    flavor = read_mlmodel(model_dir).get('flavors', {}).get('sklearn')
+    if flavor is None:
+        raise UnsupportedModelFormat("model has no sklearn flavor")
+    if flavor.get('code'):
+        raise UnsupportedModelFormat("model depends on a logged code path")
+
+    serialization_format = flavor.get('serialization_format', 'cloudpickle')
+    if serialization_format not in ('pickle', 'cloudpickle'):
+        raise UnsupportedModelFormat(f"serialization format {serialization_format!r}")
+
+    artifact = os.path.join(model_dir, flavor['pickled_model'])
+    if artifact.endswith('.joblib'):
+        import joblib
+        return joblib.load(artifact, mmap_mode=mmap_mode)
+    # Pickle dari cloudpickle dibaca oleh pickle standar
+    # (modul cloudpickle di-import otomatis jika dibutuhkan)
+    with open(artifact, 'rb') as f:
+        return pickle.load(f)
+
+
+def load_sklearn_model(model_uri, loader='lean', mmap_mode='r'):
+    """
+    Load estimator sklearn; loader='lean' mencoba load_lean lebih dulu dan
+    fallback ke mlflow.sklearn.load_model, loader='mlflow' langsung memakai MLflow
+    """
+    if loader == 'lean':
+        try:
+            return load_lean(model_uri, mmap_mode=mmap_mode)
+        except UnsupportedModelFormat as e:
+            print(f"Lean loader: {e}, falling back to MLflow")
+    import mlflow.sklearn
+    return mlflow.sklearn.load_model(model_uri)
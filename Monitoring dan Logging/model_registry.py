@@ -0,0 +1,152 @@
+"""
+Multi-model hosting untuk inference server
+Model di-load saat pertama kali diminta (run_id dicari seperti find_run_id.py)
+dan disimpan dalam LRU; jika total ukuran model melebihi budget memori, model
+yang paling lama tidak dipakai dikeluarkan.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class _HostedModel:
+    __slots__ = ('model', 'version', 'nbytes')
+
+    def __init__(self, model, version, nbytes):
+        self.model = model
+        self.version = version
+        self.nbytes = nbytes
+
+
+class ModelRegistry:
+    """
+    LRU model dengan budget memori
+
+    Parameters:
+    -----------
+    resolve_fn : callable
+        resolve_fn(run_id) -> ModelSource atau None jika run tidak ditemukan
+    load_fn : callable
+        load_fn(uri) -> model yang siap dipakai (sudah di-warm)
+    size_fn : callable
+        size_fn(model) -> perkiraan ukuran model di memori (byte)
+    max_bytes : int
+        Budget memori total; model yang baru di-load selalu disimpan
+        walaupun ukurannya sendiri melebihi budget
+    load_histogram : prometheus_client.Histogram, optional
+    load_counter : prometheus_client.Counter, optional
+        Counter dengan label 'run_id' dan 'status'
+    eviction_counter : prometheus_client.Counter, optional
+        Counter dengan label 'run_id'
+    loaded_gauge, bytes_gauge : prometheus_client.Gauge, optional
+    """
+
+    def __init__(self, resolve_fn, load_fn, size_fn, max_bytes, load_histogram=None,
+                 load_counter=None, eviction_counter=None, loaded_gauge=None, bytes_gauge=None):
+        self.resolve_fn = resolve_fn
+        self.load_fn = load_fn
+        self.size_fn = size_fn
+        self.max_bytes = max_bytes
+        self.load_histogram = load_histogram
+        self.load_counter = load_counter
+        self.eviction_counter = eviction_counter
+        self.loaded_gauge = loaded_gauge
+        self.bytes_gauge = bytes_gauge
+
+        self._models = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        # Satu lock per run_id agar request bersamaan untuk model yang sama
+        # hanya memicu satu kali load, tanpa memblokir model lain
+        self._load_locks = {}
+
+    def __len__(self):
+        return len(self._models)
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+    def loaded(self):
+        """{run_id: (version, nbytes)} urut dari yang paling lama tidak dipakai"""
+        with self._lock:
+            return {run_id: (entry.version, entry.nbytes) for run_id, entry in self._models.items()}
+
+    def _lookup(self, run_id):
+        with self._lock:
+            entry = self._models.get(run_id)
+            if entry is not None:
+                self._models.move_to_end(run_id)
+            return entry
+
+    def get(self, run_id):
+        """
+        Model untuk run_id, di-load jika belum ada
+
+        Raises:
+        -------
+        KeyError : run_id tidak punya model artifact
+        """
+        entry = self._lookup(run_id)
+        if entry is not None:
+            return entry.model
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(run_id, threading.Lock())
+        with load_lock:
+            # Request lain mungkin sudah selesai me-load selagi kita menunggu
+            entry = self._lookup(run_id)
+            if entry is not None:
+                return entry.model
+            try:
+                entry = self._load(run_id)
+            except Exception:
+                with self._lock:
+                    self._load_locks.pop(run_id, None)
+                raise
+
+            # Masukkan ke _models dan buang load lock di bawah lock yang sama:
+            # request yang datang di antaranya tidak boleh membuat lock baru
+            # lalu me-load ulang model yang belum terlihat di _models
+            with self._lock:
+                self._models[run_id] = entry
+                self._nbytes += entry.nbytes
+                self._load_locks.pop(run_id, None)
+                self._evict(keep=run_id)
+                self._set_gauges()
+        return entry.model
+
+    def _load(self, run_id):
+        source = self.resolve_fn(run_id)
+        if source is None:
+            raise KeyError(run_id)
+        start = time.perf_counter()
+        try:
+            model = self.load_fn(source.uri)
+        except Exception:
+            if self.load_counter is not None:
+                self.load_counter.labels(run_id=run_id, status='error').inc()
+            raise
+        if self.load_histogram is not None:
+            self.load_histogram.observe(time.perf_counter() - start)
+        if self.load_counter is not None:
+            self.load_counter.labels(run_id=run_id, status='success').inc()
+        return _HostedModel(model, source.version, self.size_fn(model))
+
+    def _evict(self, keep):
+        """Keluarkan model LRU sampai total ukuran <= max_bytes (lock sudah dipegang)"""
+        while self._nbytes > self.max_bytes and len(self._models) > 1:
+            run_id = next(iter(self._models))
+            if run_id == keep:
+                break
+            entry = self._models.pop(run_id)
+            self._nbytes -= entry.nbytes
+            if self.eviction_counter is not None:
+                self.eviction_counter.labels(run_id=run_id).inc()
+            print(f"Evicted model {run_id} ({entry.nbytes / 1024 ** 2:.1f} MB)")
+
+    def _set_gauges(self):
+        if self.loaded_gauge is not None:
+            self.loaded_gauge.set(len(self._models))
+        if self.bytes_gauge is not None:
+            self.bytes_gauge.set(self._nbytes)
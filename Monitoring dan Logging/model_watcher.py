@@ -0,0 +1,168 @@
+"""
+Hot model reload untuk inference server
+Background watcher yang mendeteksi model baru (run baru di mlruns/mlartifacts
+atau isi pointer file berubah), load dan warm model di luar request path,
+lalu menukar model aktif secara atomik
+"""
+import os
+import threading
+import time
+
+from find_run_id import find_mlruns_directories, get_run_ids
+from serve_model_direct import find_model_artifact_path
+
+
+class ModelSource:
+    """Lokasi model yang akan di-load beserta versi dan fingerprint-nya"""
+
+    def __init__(self, uri, version):
+        self.uri = uri
+        self.version = version
+        # Folder model yang sama tapi ditimpa ulang tetap terdeteksi lewat mtime MLmodel
+        mlmodel_path = os.path.join(uri, 'MLmodel')
+        mtime = os.path.getmtime(mlmodel_path) if os.path.exists(mlmodel_path) else None
+        self.fingerprint = (os.path.abspath(uri) if os.path.exists(uri) else uri, mtime)
+
+    def __repr__(self):
+        return f"ModelSource(version={self.version!r}, uri={self.uri!r})"
+
+
+def is_run_id(value):
+    """True jika value berbentuk run ID MLflow (32 karakter hex)"""
+    return len(value) == 32 and all(c in '0123456789abcdef' for c in value)
+
+
+def resolve_run_id(run_id):
+    """ModelSource untuk run_id tertentu (dicari seperti serve_model_direct.py)"""
+    model_path = find_model_artifact_path(run_id)
+    if model_path is None:
+        return None
+    return ModelSource(model_path, run_id)
+
+
+def resolve_latest_run(base_path='.'):
+    """ModelSource untuk run terbaru yang punya model artifact (logika find_run_id.py)"""
+    mlruns_paths, mlartifacts_paths = find_mlruns_directories(base_path)
+
+    all_runs = []
+    for mlruns_path in mlruns_paths:
+        mlartifacts_path = None
+        for ma_path in mlartifacts_paths:
+            if os.path.dirname(mlruns_path) == os.path.dirname(ma_path):
+                mlartifacts_path = ma_path
+                break
+        all_runs.extend(get_run_ids(mlruns_path, mlartifacts_path))
+
+    runs_with_model = [run for run in all_runs if run[2] and os.path.exists(run[2])]
+    if not runs_with_model:
+        return None
+    run_id, _, model_path = max(runs_with_model, key=lambda run: os.path.getmtime(run[1]))
+    return ModelSource(model_path, run_id)
+
+
+def resolve_pointer_file(pointer_file):
+    """
+    ModelSource dari pointer file
+    Isi file berupa satu baris: run_id MLflow atau path/URI model
+    """
+    if not os.path.exists(pointer_file):
+        return None
+    with open(pointer_file) as f:
+        target = f.read().strip()
+    if not target:
+        return None
+    if is_run_id(target):
+        return resolve_run_id(target)
+    return ModelSource(target, os.path.basename(os.path.normpath(target)) or target)
+
+
+class ModelWatcher:
+    """
+    Polling sumber model dan reload jika fingerprint berubah
+
+    Parameters:
+    -----------
+    resolve_fn : callable
+        resolve_fn() -> ModelSource atau None
+    load_fn : callable
+        load_fn(uri) -> model baru (belum aktif)
+    swap_fn : callable
+        swap_fn(model, version) mengganti model aktif
+    warmup_fn : callable, optional
+        warmup_fn(model) dijalankan sebelum swap
+    interval : float
+        Jeda polling dalam detik
+    reload_histogram : prometheus_client.Histogram, optional
+        Durasi load + warmup model baru
+    reload_counter : prometheus_client.Counter, optional
+        Counter dengan label 'status' (success, error)
+    """
+
+    def __init__(self, resolve_fn, load_fn, swap_fn, warmup_fn=None, interval=10.0,
+                 reload_histogram=None, reload_counter=None):
+        self.resolve_fn = resolve_fn
+        self.load_fn = load_fn
+        self.swap_fn = swap_fn
+        self.warmup_fn = warmup_fn
+        self.interval = interval
+        self.reload_histogram = reload_histogram
+        self.reload_counter = reload_counter
+
+        self.current = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def check_once(self):
+        """Cek sumber model sekali; return True jika model diganti"""
+        source = self.resolve_fn()
+        if source is None:
+            return False
+        if self.current is not None and source.fingerprint == self.current.fingerprint:
+            return False
+
+        start = time.perf_counter()
+        try:
+            new_model = self.load_fn(source.uri)
+            if self.warmup_fn is not None:
+                self.warmup_fn(new_model)
+            # Swap hanya mengganti referensi; request yang sedang berjalan
+            # tetap selesai dengan model lama yang sudah mereka pegang
+            self.swap_fn(new_model, source.version)
+        except Exception as e:
+            # Fingerprint tidak dimajukan: poll berikutnya mencoba lagi, misalnya
+            # saat artifact masih setengah tertulis ketika pertama terdeteksi
+            print(f"Error reloading model {source}: {e}")
+            if self.reload_counter is not None:
+                self.reload_counter.labels(status='error').inc()
+            return False
+
+        duration = time.perf_counter() - start
+        action = "reloaded" if self.current is not None else "loaded"
+        self.current = source
+
+        if self.reload_histogram is not None:
+            self.reload_histogram.observe(duration)
+        if self.reload_counter is not None:
+            self.reload_counter.labels(status='success').inc()
+        print(f"Model {action}: version {source.version} ({duration:.2f}s)")
+        return True
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='model-watcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check_once()
+            except Exception as e:
+                print(f"Error checking model source: {e}")
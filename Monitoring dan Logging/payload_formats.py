@@ -0,0 +1,159 @@
+"""
+Format payload biner untuk bulk scoring
+- application/json          : default, {"features": [[...], ...]}
+- application/x-npy         : file .npy (np.save) berisi matrix (rows, features)
+- application/octet-stream  : buffer little-endian mentah, shape di header X-Shape
+                              ("rows,features") dan dtype di X-Dtype (float32/float64);
+                              response berisi index kelas, label-nya di header X-Classes
+
+Body request dibungkus sebagai array NumPy dengan np.frombuffer (tanpa copy),
+response dikirim balik dalam format yang sama dengan request.
+"""
+import io
+import json
+
+import numpy as np
+
+JSON = 'json'
+NPY = 'npy'
+RAW = 'raw'
+
+_CONTENT_TYPES = {
+    'application/json': JSON,
+    'application/x-npy': NPY,
+    'application/octet-stream': RAW,
+}
+_MIMETYPES = {fmt: mimetype for mimetype, fmt in _CONTENT_TYPES.items()}
+
+_RAW_DTYPES = {
+    'float32': np.dtype('<f4'),
+    'float64': np.dtype('<f8'),
+}
+
+
+def request_format(mimetype):
+    """Format payload dari Content-Type request; JSON jika tidak dikenal/kosong"""
+    return _CONTENT_TYPES.get((mimetype or '').split(';')[0].strip().lower(), JSON)
+
+
+def mimetype_for(fmt):
+    return _MIMETYPES[fmt]
+
+
+# --------------------------------------------
+# DECODE REQUEST
+# --------------------------------------------
+def decode_npy(body):
+    """Baca header .npy lalu bungkus data setelah header tanpa copy"""
+    stream = io.BytesIO(body)
+    version = np.lib.format.read_magic(stream)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(stream)
+    elif version in ((2, 0), (3, 0)):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(stream)
+    else:
+        raise ValueError(f"Unsupported .npy version {version}")
+    if dtype.hasobject:
+        raise ValueError("Object arrays are not accepted")
+
+    count = int(np.prod(shape))
+    array = np.frombuffer(body, dtype=dtype, count=count, offset=stream.tell())
+    return array.reshape(shape, order='F' if fortran_order else 'C')
+
+
+def decode_raw(body, headers):
+    """Bungkus buffer mentah little-endian dengan shape dari header X-Shape"""
+    dtype_name = headers.get('X-Dtype', 'float64').strip().lower()
+    if dtype_name not in _RAW_DTYPES:
+        raise ValueError(f"X-Dtype must be one of {sorted(_RAW_DTYPES)}, got {dtype_name!r}")
+    dtype = _RAW_DTYPES[dtype_name]
+
+    shape_header = headers.get('X-Shape')
+    if not shape_header:
+        raise ValueError("Header X-Shape ('rows,features') is required for raw payloads")
+    try:
+        shape = tuple(int(dim) for dim in shape_header.split(','))
+    except ValueError:
+        raise ValueError(f"Invalid X-Shape header: {shape_header!r}")
+
+    if int(np.prod(shape)) * dtype.itemsize != len(body):
+        raise ValueError(f"Body has {len(body)} bytes, X-Shape {shape} x {dtype_name} needs "
+                         f"{int(np.prod(shape)) * dtype.itemsize}")
+    return np.frombuffer(body, dtype=dtype).reshape(shape)
+
+
+def decode_array(body, fmt, headers):
+    """Body request biner -> array NumPy (view ke body, read-only)"""
+    if fmt == NPY:
+        array = decode_npy(body)
+    elif fmt == RAW:
+        array = decode_raw(body, headers)
+    else:
+        raise ValueError(f"Not a binary format: {fmt}")
+    # Native byte order supaya tidak ada konversi tersembunyi di model
+    if not array.dtype.isnative:
+        array = array.astype(array.dtype.newbyteorder('='))
+    return array
+
+
+# --------------------------------------------
+# ENCODE RESPONSE
+# --------------------------------------------
+def class_indices(preds, classes):
+    """Index setiap prediksi di classes (urut naik, seperti classes_ sklearn)"""
+    classes = np.asarray(classes)
+    index = np.searchsorted(classes, preds)
+    if index.size and (index.max() >= len(classes) or not np.array_equal(classes[index], preds)):
+        raise ValueError("Predictions are not in the model classes")
+    return index
+
+
+def encode_result(preds, proba, fmt, classes=None):
+    """
+    Hasil prediksi -> (body bytes, headers tambahan)
+
+    npy : structured array dengan field 'prediction' (label string disimpan sebagai
+          unicode fixed-width) dan 'probabilities' jika ada
+    raw : matrix float64 (rows, 1 + n_classes), kolom 0 = prediksi, sisanya probabilitas.
+          Jika classes diberikan kolom 0 berisi index kelas dan label-nya dikirim
+          di header X-Classes (JSON array)
+    """
+    preds = np.asarray(preds)
+    if fmt == NPY:
+        # Label string dari classifier sklearn berupa object array, tidak bisa
+        # disimpan tanpa pickle
+        if preds.dtype.hasobject:
+            preds = preds.astype(str)
+        fields = [('prediction', preds.dtype)]
+        if proba is not None:
+            fields.append(('probabilities', np.float64, (proba.shape[1],)))
+        result = np.empty(len(preds), dtype=fields)
+        result['prediction'] = preds
+        if proba is not None:
+            result['probabilities'] = proba
+        buffer = io.BytesIO()
+        np.save(buffer, result, allow_pickle=False)
+        return buffer.getvalue(), {}
+
+    if fmt == RAW:
+        headers = {}
+        if classes is not None:
+            column = class_indices(preds, classes)
+            headers['X-Classes'] = json.dumps(np.asarray(classes).tolist())
+        elif np.issubdtype(preds.dtype, np.number):
+            column = preds
+        else:
+            raise ValueError("Raw responses need numeric predictions or the model classes")
+        columns = ['prediction']
+        result = column.astype('<f8').reshape(-1, 1)
+        if proba is not None:
+            result = np.hstack([result, proba.astype('<f8')])
+            columns += [f"proba_{i}" for i in range(proba.shape[1])]
+        headers.update({
+            'X-Shape': f"{result.shape[0]},{result.shape[1]}",
+            'X-Dtype': 'float64',
+            'X-Columns': ','.join(columns),
+        })
+        return np.ascontiguousarray(result).tobytes(), headers
+
+    raise ValueError(f"Not a binary format: {fmt}")
@@ -0,0 +1,156 @@
+"""
+Prediction cache untuk inference server
+Cache in-process per baris feature dengan LRU eviction, TTL,
+batas jumlah entry dan batas memori
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# Perkiraan overhead per entry (OrderedDict node, tuple, objek bytes/ndarray)
+_ENTRY_OVERHEAD_BYTES = 240
+
+
+class PredictionCache:
+    """
+    Cache hasil prediksi per baris, key = bytes dari feature vector
+
+    Parameters:
+    -----------
+    max_entries : int
+        Jumlah entry maksimum
+    max_bytes : int
+        Perkiraan memori maksimum (key + value + overhead)
+    ttl_seconds : float
+        Umur maksimum entry dalam detik, None = tanpa TTL
+    decimals : int, optional
+        Jika diisi, feature dibulatkan ke sejumlah desimal ini sebelum dijadikan key
+        sehingga vector yang hampir sama berbagi entry
+    hits_counter, misses_counter : prometheus_client.Counter, optional
+    evictions_counter : prometheus_client.Counter, optional
+        Counter dengan label 'reason' (capacity, memory, ttl)
+    """
+
+    def __init__(self, max_entries=10000, max_bytes=64 * 1024 * 1024, ttl_seconds=300.0,
+                 decimals=None, hits_counter=None, misses_counter=None, evictions_counter=None):
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.decimals = decimals
+        self.hits_counter = hits_counter
+        self.misses_counter = misses_counter
+        self.evictions_counter = evictions_counter
+
+        self._entries = OrderedDict()  # key -> (expires_at, pred, proba, nbytes)
+        self._lock = threading.Lock()
+        self._bytes = 0
+        # Naik setiap invalidate(); hasil dari model lama tidak boleh masuk cache
+        self._generation = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def invalidate(self):
+        """Kosongkan cache, dipanggil setiap kali model berganti"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._generation += 1
+
+    # --------------------------------------------
+    # KEY
+    # --------------------------------------------
+    def _keys(self, X):
+        if self.decimals is not None:
+            # + 0.0 menyamakan -0.0 dan 0.0 setelah pembulatan
+            X = np.round(X, self.decimals) + 0.0
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        return [row.tobytes() for row in X]
+
+    # --------------------------------------------
+    # LOOKUP / STORE
+    # --------------------------------------------
+    def _get(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] is not None and entry[0] <= now:
+            self._remove(key, 'ttl')
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _remove(self, key, reason):
+        entry = self._entries.pop(key)
+        self._bytes -= entry[3]
+        if self.evictions_counter is not None:
+            self.evictions_counter.labels(reason=reason).inc()
+
+    def _put(self, key, pred, proba, now):
+        nbytes = len(key) + _ENTRY_OVERHEAD_BYTES + (proba.nbytes if proba is not None else 0)
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[3]
+        expires_at = now + self.ttl_seconds if self.ttl_seconds else None
+        self._entries[key] = (expires_at, pred, proba, nbytes)
+        self._bytes += nbytes
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)), 'capacity')
+        while self._bytes > self.max_bytes and self._entries:
+            self._remove(next(iter(self._entries)), 'memory')
+
+    def predict(self, X, return_proba, predict_fn):
+        """
+        Prediksi X dengan cache; hanya baris yang miss dikirim ke predict_fn
+
+        predict_fn(X_miss, True) -> (preds, proba, ...), selalu dengan probabilitas
+        supaya entry cache bisa melayani request dengan atau tanpa return_proba;
+        elemen setelah proba dari panggilan miss ikut dikembalikan (kosong jika
+        semua baris hit)
+        """
+        keys = self._keys(X)
+        now = time.monotonic()
+        with self._lock:
+            generation = self._generation
+            cached = [self._get(key, now) for key in keys]
+
+        miss_idx = [i for i, entry in enumerate(cached) if entry is None]
+        n_hits = len(keys) - len(miss_idx)
+        if self.hits_counter is not None and n_hits:
+            self.hits_counter.inc(n_hits)
+        if self.misses_counter is not None and miss_idx:
+            self.misses_counter.inc(len(miss_idx))
+
+        preds = [None] * len(keys)
+        probas = [None] * len(keys)
+        for i, entry in enumerate(cached):
+            if entry is not None:
+                preds[i] = entry[1]
+                probas[i] = entry[2]
+
+        extra = ()
+        if miss_idx:
+            miss_preds, miss_proba, *extra = predict_fn(X[miss_idx], True)
+            now = time.monotonic()
+            with self._lock:
+                store = generation == self._generation
+                for j, i in enumerate(miss_idx):
+                    row_proba = miss_proba[j].copy() if miss_proba is not None else None
+                    preds[i] = miss_preds[j]
+                    probas[i] = row_proba
+                    if store:
+                        self._put(keys[i], miss_preds[j], row_proba, now)
+
+        preds = np.asarray(preds)
+        if not return_proba or any(p is None for p in probas):
+            return (preds, None, *extra)
+        return (preds, np.vstack(probas), *extra)
@@ -0,0 +1,366 @@
+"""
+Log prediksi append-only untuk audit dan retraining
+Handler /predict hanya memasukkan record ke antrian terbatas di memori
+(tidak pernah blocking; jika penuh record dibuang dan dihitung). Thread writer
+mengambil semua record yang sudah menunggu dan menulisnya sekaligus ke file
+segment biner:
+
+    header (1024 byte) : magic, versi format, n_features, n_classes, ada proba,
+                         waktu dibuat, versi model (UTF-8), classes_ (JSON)
+    record (fixed)     : timestamp f8, latency f4, prediction i2 (index ke classes_),
+                         features f4[n_features], proba f4[n_classes]
+
+Segment dirotasi berdasarkan ukuran, umur, dan saat versi model, kelas atau
+jumlah feature berubah, sehingga satu segment selalu satu dtype.
+read_segment() me-memory-map record kembali sebagai structured array NumPy,
+prediction_labels() mengubah index prediksi kembali menjadi label kelas.
+
+Penggunaan reader:
+    python prediction_log.py <folder log>
+"""
+import os
+import sys
+import json
+import time
+import queue
+import struct
+import threading
+
+import numpy as np
+
+from payload_formats import class_indices
+
+MAGIC = b'PREDLOG\x00'
+FORMAT_VERSION = 2
+HEADER_SIZE = 1024
+SEGMENT_SUFFIX = '.seg'
+# magic, versi format, n_features, n_classes, ada proba, panjang versi model,
+# panjang JSON classes_, waktu dibuat
+_HEADER = struct.Struct('<8sHHHHHHd')
+
+
+def record_dtype(n_features, n_classes, has_proba=True):
+    """Structured dtype satu record (little-endian, tanpa padding)"""
+    fields = [
+        ('timestamp', '<f8'),
+        ('latency', '<f4'),
+        ('prediction', '<i2'),
+        ('features', '<f4', (n_features,)),
+    ]
+    if has_proba:
+        fields.append(('proba', '<f4', (n_classes,)))
+    return np.dtype(fields)
+
+
+def encode_header(n_features, classes, has_proba, model_version, created_at):
+    version = (model_version or '').encode('utf-8')
+    classes_json = json.dumps(list(classes)).encode('utf-8')
+    if _HEADER.size + len(version) + len(classes_json) > HEADER_SIZE:
+        raise ValueError("Model version and class labels do not fit in the segment header")
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, n_features, len(classes), int(has_proba),
+                          len(version), len(classes_json), created_at)
+    return (header + version + classes_json).ljust(HEADER_SIZE, b'\x00')
+
+
+def decode_header(raw):
+    (magic, fmt_version, n_features, n_classes, has_proba, version_len,
+     classes_len, created_at) = _HEADER.unpack_from(raw)
+    if magic != MAGIC:
+        raise ValueError("Not a prediction log segment")
+    if fmt_version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported segment format version {fmt_version}")
+    offset = _HEADER.size
+    version = raw[offset:offset + version_len].decode('utf-8')
+    offset += version_len
+    classes = json.loads(raw[offset:offset + classes_len].decode('utf-8'))
+    return {
+        'n_features': n_features,
+        'n_classes': n_classes,
+        'has_proba': bool(has_proba),
+        'classes': np.asarray(classes),
+        'model_version': version or None,
+        'created_at': created_at,
+    }
+
+
+# --------------------------------------------
+# READER
+# --------------------------------------------
+def list_segments(directory):
+    """Path semua segment di folder, urut waktu dibuat (nama file)"""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                  if name.endswith(SEGMENT_SUFFIX))
+
+
+def read_segment(path):
+    """
+    Memory-map satu segment
+
+    Returns:
+    --------
+    header : dict (n_features, n_classes, has_proba, classes, model_version, created_at)
+    records : np.memmap structured array (read-only); record terakhir yang
+        belum lengkap (segment yang masih ditulis) diabaikan
+    """
+    with open(path, 'rb') as f:
+        header = decode_header(f.read(HEADER_SIZE))
+    dtype = record_dtype(header['n_features'], header['n_classes'], header['has_proba'])
+    n_records = (os.path.getsize(path) - HEADER_SIZE) // dtype.itemsize
+    if n_records <= 0:
+        return header, np.empty(0, dtype=dtype)
+    return header, np.memmap(path, dtype=dtype, mode='r', offset=HEADER_SIZE, shape=(n_records,))
+
+
+def prediction_labels(header, records):
+    """Index prediksi di records -> label kelas asli model (mis. 'High'/'Low'/'Medium')"""
+    return header['classes'].take(records['prediction'])
+
+
+# --------------------------------------------
+# WRITER
+# --------------------------------------------
+class _Segment:
+    """Satu file segment yang sedang ditulis"""
+
+    def __init__(self, path, key, created_at):
+        self.path = path
+        self.key = key
+        self.created_at = created_at
+        self.file = open(path, 'wb')
+        model_version, n_features, classes, has_proba = key
+        self.file.write(encode_header(n_features, classes, has_proba, model_version, time.time()))
+        self.size = HEADER_SIZE
+
+    def write(self, data):
+        self.file.write(data)
+        self.file.flush()
+        self.size += len(data)
+
+    def close(self):
+        self.file.close()
+
+
+class PredictionLogger:
+    """
+    Parameters:
+    -----------
+    directory : str
+        Folder segment (dibuat jika belum ada)
+    max_queue : int
+        Jumlah request yang boleh menunggu ditulis; lebihnya dibuang
+    max_batch : int
+        Jumlah request maksimum per flush
+    max_segment_bytes : int
+        Rotasi segment jika ukurannya melewati batas ini
+    max_segment_seconds : float
+        Rotasi segment jika umurnya melewati batas ini
+    fsync : bool
+        os.fsync setiap flush (lebih tahan crash host, flush lebih lambat)
+    dropped_counter : prometheus_client.Counter, optional
+        Jumlah baris yang dibuang karena antrian penuh atau gagal ditulis
+    records_counter : prometheus_client.Counter, optional
+        Jumlah baris yang sudah ditulis ke segment
+    flush_histogram : prometheus_client.Histogram, optional
+        Durasi satu flush batch ke file (detik)
+    queue_depth_gauge : prometheus_client.Gauge, optional
+        Jumlah request di antrian, di-update setiap flush
+    """
+
+    def __init__(self, directory, max_queue=10000, max_batch=1024, max_segment_bytes=64 * 1024 * 1024,
+                 max_segment_seconds=3600.0, fsync=False, dropped_counter=None, records_counter=None,
+                 flush_histogram=None, queue_depth_gauge=None):
+        if max_queue < 1 or max_batch < 1:
+            raise ValueError("max_queue and max_batch must be >= 1")
+        self.directory = directory
+        self.max_batch = max_batch
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_seconds = max_segment_seconds
+        self.fsync = fsync
+        self.dropped_counter = dropped_counter
+        self.records_counter = records_counter
+        self.flush_histogram = flush_histogram
+        self.queue_depth_gauge = queue_depth_gauge
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._segment = None
+        self._sequence = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def start(self):
+        """Menjalankan writer thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='prediction-log', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Tulis semua record yang tersisa lalu tutup segment aktif"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def log(self, X, preds, proba, latency, model_version=None, classes=None):
+        """
+        Antrikan hasil satu request (N baris); tidak pernah blocking
+        classes : classes_ model yang menghasilkan preds (prediksi disimpan sebagai index)
+        """
+        try:
+            self._queue.put_nowait((time.time(), X, preds, proba, latency, model_version, classes))
+            return True
+        except queue.Full:
+            if self.dropped_counter is not None:
+                self.dropped_counter.inc(len(X))
+            return False
+
+    # --------------------------------------------
+    # WORKER
+    # --------------------------------------------
+    def _run(self):
+        stopping = False
+        while not stopping:
+            try:
+                # Timeout supaya rotasi berdasarkan umur tetap jalan saat tidak ada trafik
+                first = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                self._rotate_if_old()
+                continue
+            items = []
+            if first is None:
+                stopping = True
+            else:
+                items.append(first)
+            while len(items) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    continue
+                items.append(item)
+            if items:
+                try:
+                    self._flush(items)
+                except Exception as e:
+                    # Error disk tidak boleh mematikan writer; baris batch ini hilang
+                    print(f"Error writing prediction log: {e}")
+                    if self.dropped_counter is not None:
+                        self.dropped_counter.inc(sum(len(item[1]) for item in items))
+            if self.queue_depth_gauge is not None:
+                self.queue_depth_gauge.set(self._queue.qsize())
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+
+    def _flush(self, items):
+        start = time.perf_counter()
+        n_rows = 0
+        # Request berurutan dengan dtype sama digabung menjadi satu write
+        groups = []
+        for item in items:
+            key = self._key(item)
+            if not groups or groups[-1][0] != key:
+                groups.append((key, []))
+            groups[-1][1].append(item)
+        for key, group in groups:
+            try:
+                n_rows += self._write(key, group)
+            except Exception as e:
+                # Grup yang gagal (mis. prediksi di luar classes_) dihitung dan
+                # dilaporkan, grup lain di batch yang sama tetap ditulis
+                print(f"Error writing prediction log: {e}")
+                if self.dropped_counter is not None:
+                    self.dropped_counter.inc(sum(len(item[1]) for item in group))
+        if self.fsync and self._segment is not None:
+            os.fsync(self._segment.file.fileno())
+
+        if self.flush_histogram is not None:
+            self.flush_histogram.observe(time.perf_counter() - start)
+        if self.records_counter is not None:
+            self.records_counter.inc(n_rows)
+
+    @staticmethod
+    def _key(item):
+        _, X, _, proba, _, model_version, classes = item
+        classes = tuple(np.asarray(classes).tolist()) if classes is not None else ()
+        return (model_version or '', X.shape[1], classes, proba is not None)
+
+    def _write(self, key, items):
+        """Satu write untuk semua request dengan key (versi, n_features, classes, proba) sama"""
+        _, n_features, classes, has_proba = key
+        if not classes:
+            raise ValueError("Model has no classes_, predictions cannot be logged")
+        dtype = record_dtype(n_features, len(classes), has_proba)
+        n_rows = sum(len(item[1]) for item in items)
+        records = np.empty(n_rows, dtype=dtype)
+        offset = 0
+        for timestamp, X, preds, proba, latency, _, _ in items:
+            end = offset + len(X)
+            block = records[offset:end]
+            block['timestamp'] = timestamp
+            block['latency'] = latency
+            # ValueError jika ada prediksi di luar classes_: batch dihitung sebagai dropped
+            block['prediction'] = class_indices(preds, classes)
+            block['features'] = X
+            if has_proba:
+                block['proba'] = proba
+            offset = end
+
+        data = records.tobytes()
+        segment = self._segment_for(key, len(data))
+        segment.write(data)
+        return n_rows
+
+    def _segment_for(self, key, n_bytes):
+        segment = self._segment
+        if segment is not None and (
+                segment.key != key
+                or segment.size + n_bytes > self.max_segment_bytes and segment.size > HEADER_SIZE
+                or time.monotonic() - segment.created_at >= self.max_segment_seconds):
+            segment.close()
+            segment = None
+        if segment is None:
+            self._sequence += 1
+            name = (f"predictions-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+                    f"-{self._sequence:06d}{SEGMENT_SUFFIX}")
+            segment = _Segment(os.path.join(self.directory, name), key, time.monotonic())
+            self._segment = segment
+        return segment
+
+    def _rotate_if_old(self):
+        segment = self._segment
+        if segment is not None and time.monotonic() - segment.created_at >= self.max_segment_seconds:
+            segment.close()
+            self._segment = None
+
+
+# --------------------------------------------
+# CLI: RINGKASAN SEGMENT
+# --------------------------------------------
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python prediction_log.py <folder log>")
+        return 1
+    segments = list_segments(sys.argv[1])
+    total = 0
+    for path in segments:
+        header, records = read_segment(path)
+        total += len(records)
+        span = ''
+        if len(records):
+            labels, counts = np.unique(prediction_labels(header, records), return_counts=True)
+            span += ', ' + ' '.join(f"{label}={count}" for label, count in zip(labels, counts))
+            start = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(records['timestamp'][0]))
+            span += f", from {start}, p99 latency {np.percentile(records['latency'], 99) * 1000:.2f} ms"
+        print(f"{os.path.basename(path)}: {len(records)} rows, {header['n_features']} features, "
+              f"classes {header['classes'].tolist()}, model {header['model_version']}{span}")
+    print(f"{len(segments)} segments, {total} rows")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,293 @@
+"""
+Custom Prometheus collector untuk metrics proses server inference
+Semua nilai dihitung saat /metrics di-scrape (tanpa thread polling):
+CPU time, RSS, jumlah thread dan file descriptor per proses, jumlah koleksi
+dan total pause GC per generasi, serta ukuran array model di memori.
+MultiprocessProcessMetrics menulis ukuran model dan statistik GC yang sama
+ke file multiprocess untuk sidecar yang tidak bisa menghitungnya sendiri.
+"""
+import gc
+import os
+import time
+import threading
+from collections import deque
+
+import numpy as np
+import psutil
+from prometheus_client import Counter, Gauge
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+
+class GcPauseTracker:
+    """
+    Akumulasi jumlah koleksi dan durasi pause GC per generasi lewat gc.callbacks
+    Callback dipanggil oleh interpreter di thread yang memicu GC (GIL dipegang),
+    jadi cukup menyimpan waktu start dan menambahkan selisihnya saat stop.
+
+    Parameters:
+    -----------
+    pause_histogram : prometheus_client.Histogram, optional
+        Histogram dengan label 'generation'; setiap pause diobservasi agar
+        distribusinya (bukan hanya totalnya) bisa dibandingkan dengan tail latency
+    defer : bool
+        Tampung pause dan observasi baru di flush(). Wajib di multiprocess mode:
+        semua metrics memakai satu Lock global, dan GC bisa terpicu saat thread
+        yang sama sedang memegangnya (callback lalu deadlock)
+    """
+
+    def __init__(self, pause_histogram=None, defer=False):
+        self.pause_histogram = pause_histogram
+        self.defer = defer
+        # Dibatasi: proses yang tidak pernah flush (master pre-fork) tidak bocor
+        self._pending = deque(maxlen=4096)
+        n_generations = len(gc.get_count())
+        self.collections = [0] * n_generations
+        self.collected = [0] * n_generations
+        self.pause_seconds = [0.0] * n_generations
+        self._start = None
+        self._installed = False
+
+    def _callback(self, phase, info):
+        if phase == 'start':
+            self._start = time.perf_counter()
+        elif phase == 'stop' and self._start is not None:
+            generation = info['generation']
+            pause = time.perf_counter() - self._start
+            self.pause_seconds[generation] += pause
+            self.collections[generation] += 1
+            self.collected[generation] += info.get('collected', 0)
+            self._start = None
+            if self.pause_histogram is None:
+                return
+            if self.defer:
+                self._pending.append((generation, pause))
+            else:
+                self.pause_histogram.labels(generation=str(generation)).observe(pause)
+
+    def flush(self):
+        """Observasi pause yang ditampung (defer=True) ke pause_histogram"""
+        while self._pending:
+            generation, pause = self._pending.popleft()
+            self.pause_histogram.labels(generation=str(generation)).observe(pause)
+
+    def install(self):
+        if not self._installed:
+            gc.callbacks.append(self._callback)
+            self._installed = True
+
+    def uninstall(self):
+        if self._installed:
+            gc.callbacks.remove(self._callback)
+            self._installed = False
+
+
+def estimate_model_bytes(model):
+    """
+    Total byte array NumPy yang dipegang model (node tree, threshold, value, dst)
+    Tree sklearn (Cython) tidak punya __dict__, array-nya diambil dari __getstate__()
+    """
+    total = 0
+    # Objek disimpan (bukan hanya id-nya) karena state dict dari __getstate__()
+    # bersifat sementara dan id-nya bisa dipakai ulang setelah objeknya dibuang
+    seen = {}
+    stack = [model]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen[id(obj)] = obj
+
+        if isinstance(obj, np.ndarray):
+            if obj.dtype == object:
+                stack.extend(obj.ravel().tolist())
+            else:
+                total += obj.nbytes
+        elif isinstance(obj, dict):
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set)):
+            stack.extend(obj)
+        elif hasattr(obj, '__dict__'):
+            stack.extend(vars(obj).values())
+        elif hasattr(obj, 'node_count') and hasattr(obj, '__getstate__'):
+            stack.append(obj.__getstate__())
+    return total
+
+
+class ProcessMetricsCollector:
+    """
+    Collector scrape-time untuk proses ini (dan opsional proses anak)
+
+    Parameters:
+    -----------
+    model_fn : callable, optional
+        Return model yang sedang aktif (atau None); ukurannya di-cache per objek model
+    include_children : bool
+        Sertakan CPU/RSS/thread/FD proses anak (worker pre-fork) dengan label pid
+    gc_tracker : GcPauseTracker, optional
+        Default: tracker baru yang langsung dipasang ke gc.callbacks
+    pid : int, optional
+        Pantau proses lain (mis. server dari metrics_sidecar.py); metrics GC
+        hanya tersedia untuk proses sendiri, jadi dilewati kecuali gc_tracker diberikan
+    """
+
+    def __init__(self, model_fn=None, include_children=False, gc_tracker=None, pid=None):
+        self.model_fn = model_fn
+        self.include_children = include_children
+        self.process = psutil.Process(pid)
+        if gc_tracker is None and pid is None:
+            gc_tracker = GcPauseTracker()
+            gc_tracker.install()
+        self.gc_tracker = gc_tracker
+        self._model_ref = None
+        self._model_bytes = 0
+        self._lock = threading.Lock()
+        # Panggilan pertama cpu_percent(interval=None) hanya menyiapkan baseline;
+        # berikutnya mengembalikan CPU host sejak scrape sebelumnya tanpa blocking
+        psutil.cpu_percent(interval=None)
+
+    def _processes(self):
+        processes = [self.process]
+        if self.include_children:
+            try:
+                # Sidecar (metrics_sidecar.py) adalah anak server, jangan ikut dilaporkan
+                processes.extend(child for child in self.process.children() if child.pid != os.getpid())
+            except psutil.Error:
+                pass
+        return processes
+
+    def _model_nbytes(self):
+        model = self.model_fn() if self.model_fn is not None else None
+        if model is None:
+            return None
+        with self._lock:
+            if self._model_ref is not model:
+                self._model_bytes = estimate_model_bytes(model)
+                self._model_ref = model
+            return self._model_bytes
+
+    def collect(self):
+        cpu = CounterMetricFamily('model_server_process_cpu_seconds',
+                                  'CPU time consumed by the serving process',
+                                  labels=['pid', 'mode'])
+        rss = GaugeMetricFamily('model_server_process_resident_memory_bytes',
+                                'Resident set size of the serving process',
+                                labels=['pid'])
+        threads = GaugeMetricFamily('model_server_process_threads',
+                                    'Number of OS threads in the serving process',
+                                    labels=['pid'])
+        fds = GaugeMetricFamily('model_server_process_open_fds',
+                                'Number of open file descriptors (handles on Windows)',
+                                labels=['pid'])
+
+        for proc in self._processes():
+            pid = str(proc.pid)
+            try:
+                with proc.oneshot():
+                    times = proc.cpu_times()
+                    cpu.add_metric([pid, 'user'], times.user)
+                    cpu.add_metric([pid, 'system'], times.system)
+                    rss.add_metric([pid], proc.memory_info().rss)
+                    threads.add_metric([pid], proc.num_threads())
+                    n_fds = proc.num_fds() if hasattr(proc, 'num_fds') else proc.num_handles()
+                    fds.add_metric([pid], n_fds)
+            except psutil.Error:
+                # Worker bisa saja keluar di tengah scrape
+                continue
+        yield cpu
+        yield rss
+        yield threads
+        yield fds
+
+        if self.gc_tracker is not None:
+            yield from self._collect_gc()
+
+        model_bytes = self._model_nbytes()
+        if model_bytes is not None:
+            yield GaugeMetricFamily('model_memory_bytes',
+                                    'Memory held by the active model arrays in bytes',
+                                    value=model_bytes)
+
+        # Nama lama dipertahankan untuk dashboard dan alert Grafana yang sudah ada
+        yield GaugeMetricFamily('system_cpu_usage', 'System CPU usage percentage',
+                                value=psutil.cpu_percent(interval=None))
+        yield GaugeMetricFamily('system_ram_usage', 'System RAM usage percentage',
+                                value=psutil.virtual_memory().percent)
+
+    def _collect_gc(self):
+        pid = str(self.process.pid)
+        collections = CounterMetricFamily('model_server_gc_collections',
+                                          'Garbage collections per generation',
+                                          labels=['pid', 'generation'])
+        collected = CounterMetricFamily('model_server_gc_collected_objects',
+                                        'Objects collected by the garbage collector per generation',
+                                        labels=['pid', 'generation'])
+        pause = CounterMetricFamily('model_server_gc_pause_seconds',
+                                    'Total time spent in garbage collection per generation',
+                                    labels=['pid', 'generation'])
+        tracker = self.gc_tracker
+        for generation in range(len(tracker.collections)):
+            labels = [pid, str(generation)]
+            collections.add_metric(labels, tracker.collections[generation])
+            collected.add_metric(labels, tracker.collected[generation])
+            pause.add_metric(labels, tracker.pause_seconds[generation])
+        yield collections
+        yield collected
+        yield pause
+
+
+class MultiprocessProcessMetrics:
+    """
+    Ukuran model dan statistik GC ProcessMetricsCollector untuk multiprocess mode
+    Sidecar (metrics_sidecar.py) hanya membaca file mmap dan tidak bisa melihat
+    model maupun gc.callbacks proses server, jadi proses server menulis nilainya
+    sendiri lewat publish() dengan nama series yang sama
+
+    Parameters:
+    -----------
+    model_fn : callable, optional
+        Return model yang sedang aktif (atau None)
+    gc_tracker : GcPauseTracker
+        Tracker yang sudah dipasang di proses ini
+    """
+
+    def __init__(self, model_fn=None, gc_tracker=None):
+        self.model_fn = model_fn
+        self.gc_tracker = gc_tracker
+        self.pid = str(os.getpid())
+        self._model_ref = None
+        self._model_bytes = 0
+        self.model_memory = Gauge('model_memory_bytes',
+                                  'Memory held by the active model arrays in bytes',
+                                  multiprocess_mode='livemax')
+        labels = ['pid', 'generation']
+        self.collections = Counter('model_server_gc_collections',
+                                   'Garbage collections per generation', labels)
+        self.collected = Counter('model_server_gc_collected_objects',
+                                 'Objects collected by the garbage collector per generation', labels)
+        self.pause = Counter('model_server_gc_pause_seconds',
+                             'Total time spent in garbage collection per generation', labels)
+        # Nilai kumulatif tracker yang sudah ditulis, Counter hanya bisa inc(delta)
+        self._published = {}
+
+    def publish(self):
+        """Tulis nilai terbaru; dipanggil berkala dari thread biasa, bukan dari gc.callbacks"""
+        model = self.model_fn() if self.model_fn is not None else None
+        if model is not self._model_ref:
+            self._model_bytes = estimate_model_bytes(model) if model is not None else 0
+            self._model_ref = model
+        self.model_memory.set(self._model_bytes)
+
+        tracker = self.gc_tracker
+        if tracker is None:
+            return
+        for generation in range(len(tracker.collections)):
+            labels = (self.pid, str(generation))
+            for counter, values in ((self.collections, tracker.collections),
+                                    (self.collected, tracker.collected),
+                                    (self.pause, tracker.pause_seconds)):
+                key = (counter, generation)
+                value = values[generation]
+                delta = value - self._published.get(key, 0)
+                if delta > 0:
+                    counter.labels(*labels).inc(delta)
+                self._published[key] = value
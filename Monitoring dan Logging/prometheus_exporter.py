@@ -1,10 +1,34 @@
-from flask import Flask, request, jsonify
-from prometheus_client import start_http_server, Counter, Histogram, Gauge
+from flask import Flask, Response, request, jsonify, stream_with_context
+from prometheus_client import start_http_server, Counter, Histogram, Gauge, REGISTRY
+import gc
 import time
 import threading
-import psutil
-import mlflow
-import mlflow.sklearn
+import os
+import argparse
+import json
+import numpy as np
+from batching import MicroBatcher
+from forest_engine import CompiledForest, default_data_path
+from model_loader import load_sklearn_model
+from prediction_cache import PredictionCache
+from prediction_log import PredictionLogger
+from rate_tracker import RateTracker
+from process_collector import ProcessMetricsCollector, GcPauseTracker
+from admission import AdmissionController, Overloaded
+from warmup import load_replay_rows, run_warmup
+from model_registry import ModelRegistry
+from shadow import ShadowMirror
+from execution_planner import ExecutionPlanner
+from early_exit import EarlyExitForest
+from explain import SaabasExplainer
+from sampling_profiler import SamplingProfiler, ProfilerBusy, format_collapsed
+from process_collector import estimate_model_bytes
+from stage_timer import RequestTimer, DEFAULT_LATENCY_BUCKETS, parse_buckets
+import payload_formats
+import stream_scoring
+from model_watcher import (
+    ModelWatcher, ModelSource, is_run_id, resolve_latest_run, resolve_pointer_file, resolve_run_id
+)
 
 # --------------------------------------------
 # METRICS SETUP
@@ -23,82 +47,656 @@ api_latency_seconds = Histogram(
     ['endpoint']
 )
 
-# Gauge untuk throughput
+# Gauge untuk throughput (request sukses per menit, sliding window 60 detik)
 throughput_per_minute = Gauge(
     'throughput_per_minute',
-    'Number of requests per minute'
+    'Number of requests per minute',
+    multiprocess_mode='livesum'
+)
+
+# Gauge untuk rate request dan error per detik (window 1s, 10s, 60s)
+request_rate_per_second = Gauge(
+    'request_rate_per_second',
+    'Prediction requests per second over a sliding window',
+    ['window'],
+    multiprocess_mode='livesum'
+)
+error_rate_per_second = Gauge(
+    'error_rate_per_second',
+    'Failed prediction requests per second over a sliding window',
+    ['window'],
+    multiprocess_mode='livesum'
+)
+
+# Histogram untuk ukuran batch (jumlah baris per panggilan model)
+predict_batch_size = Histogram(
+    'predict_batch_size',
+    'Number of rows scored per model call',
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096)
+)
+
+# Histogram untuk waktu tunggu request di antrian micro-batching
+predict_queue_wait_seconds = Histogram(
+    'predict_queue_wait_seconds',
+    'Time a request waits in the micro-batching queue in seconds',
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1)
+)
+
+# Histogram CPU time thread micro-batcher per panggilan model
+predict_batch_cpu_seconds = Histogram(
+    'predict_batch_cpu_seconds',
+    'CPU time of the micro-batcher thread per batched model call in seconds',
+    buckets=DEFAULT_LATENCY_BUCKETS
+)
+
+# Counter dan gauge untuk prediction cache (per baris)
+prediction_cache_hits_total = Counter(
+    'prediction_cache_hits_total',
+    'Number of rows served from the prediction cache'
+)
+prediction_cache_misses_total = Counter(
+    'prediction_cache_misses_total',
+    'Number of rows that missed the prediction cache'
+)
+prediction_cache_evictions_total = Counter(
+    'prediction_cache_evictions_total',
+    'Number of prediction cache entries evicted',
+    ['reason']
+)
+prediction_cache_entries = Gauge(
+    'prediction_cache_entries',
+    'Number of entries in the prediction cache',
+    multiprocess_mode='livesum'
+)
+prediction_cache_bytes = Gauge(
+    'prediction_cache_bytes',
+    'Estimated memory used by the prediction cache in bytes',
+    multiprocess_mode='livesum'
+)
+
+# Gauge versi model aktif (value 1 untuk versi yang sedang melayani request)
+model_active_version = Gauge(
+    'model_active_version',
+    'Currently active model version',
+    ['version'],
+    multiprocess_mode='livemax'
+)
+
+# Histogram dan counter untuk hot reload model
+model_reload_duration_seconds = Histogram(
+    'model_reload_duration_seconds',
+    'Time to load and warm a new model before swapping it in',
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+model_reloads_total = Counter(
+    'model_reloads_total',
+    'Number of model reload attempts',
+    ['status']
+)
+
+# Warmup sebelum server melaporkan ready
+warmup_latency_seconds = Histogram(
+    'warmup_latency_seconds',
+    'Latency of warmup predictions by input source and batch size',
+    ['source', 'batch_size'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+warmup_duration_seconds = Gauge(
+    'warmup_duration_seconds',
+    'Total time of the startup warmup phase',
+    multiprocess_mode='livemax'
+)
+# Dibuat di build_ready_gauge() oleh proses yang benar-benar melayani request.
+# Master pre-fork (serve_prefork.py) tidak pernah warmup; jika gauge dibuat di
+# sana nilai 0-nya selalu menang di agregasi livemin
+server_ready = None
+
+def build_ready_gauge():
+    global server_ready
+    if server_ready is None:
+        server_ready = Gauge(
+            'server_ready',
+            'Whether the server finished warmup and reports ready (1) or not (0)',
+            multiprocess_mode='livemin'
+        )
+    return server_ready
+
+# Admission control: request yang ditolak, antrian tunggu dan request in-flight
+admission_shed_total = Counter(
+    'admission_shed_total',
+    'Number of /predict requests rejected by admission control',
+    ['reason']
+)
+admission_queue_depth = Gauge(
+    'admission_queue_depth',
+    'Number of /predict requests waiting for an execution slot',
+    multiprocess_mode='livesum'
+)
+admission_in_flight = Gauge(
+    'admission_in_flight',
+    'Number of /predict requests currently admitted',
+    multiprocess_mode='livesum'
+)
+admission_queue_wait_seconds = Histogram(
+    'admission_queue_wait_seconds',
+    'Time an admitted /predict request waited for a slot in seconds',
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
 )
 
-# Gauge untuk CPU usage
-system_cpu_usage = Gauge(
-    'system_cpu_usage',
-    'System CPU usage percentage',
-    ['instance', 'job']
+# Multi-model hosting (/models/<run_id>/predict)
+hosted_model_latency_seconds = Histogram(
+    'hosted_model_latency_seconds',
+    'Latency of /models/<run_id>/predict requests per model',
+    ['run_id'],
+    buckets=DEFAULT_LATENCY_BUCKETS
+)
+hosted_model_loads_total = Counter(
+    'hosted_model_loads_total',
+    'Number of on-demand model loads',
+    ['run_id', 'status']
+)
+hosted_model_evictions_total = Counter(
+    'hosted_model_evictions_total',
+    'Number of hosted models evicted to stay within the memory budget',
+    ['run_id']
+)
+hosted_model_load_duration_seconds = Histogram(
+    'hosted_model_load_duration_seconds',
+    'Time to load and warm a hosted model on first use',
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+hosted_models_loaded = Gauge(
+    'hosted_models_loaded',
+    'Number of hosted models currently in memory',
+    multiprocess_mode='livesum'
+)
+hosted_models_bytes = Gauge(
+    'hosted_models_bytes',
+    'Estimated memory held by hosted models in bytes',
+    multiprocess_mode='livesum'
 )
 
-# Gauge untuk RAM usage
-system_ram_usage = Gauge(
-    'system_ram_usage',
-    'System RAM usage percentage',
-    ['instance', 'job']
+# Shadow traffic ke model kandidat
+shadow_latency_seconds = Histogram(
+    'shadow_latency_seconds',
+    'Latency of shadow model predictions',
+    buckets=DEFAULT_LATENCY_BUCKETS
+)
+shadow_requests_total = Counter(
+    'shadow_requests_total',
+    'Number of mirrored requests by outcome (ok, dropped, error)',
+    ['status']
+)
+shadow_rows_total = Counter(
+    'shadow_rows_total',
+    'Rows scored by the shadow model by agreement with the primary model',
+    ['result']
+)
+shadow_agreement_ratio = Gauge(
+    'shadow_agreement_ratio',
+    'Fraction of shadow rows whose prediction matches the primary model since start',
+    multiprocess_mode='liveall'
 )
 
+# Execution planner: strategi yang dipilih per panggilan model dan durasinya
+execution_plan_total = Counter(
+    'execution_plan_total',
+    'Model calls by execution strategy (single, tree_parallel, row_chunk)',
+    ['strategy']
+)
+execution_plan_seconds = Histogram(
+    'execution_plan_seconds',
+    'predict_proba duration by execution strategy',
+    ['strategy'],
+    buckets=DEFAULT_LATENCY_BUCKETS
+)
+execution_plan_calibration_seconds = Gauge(
+    'execution_plan_calibration_seconds',
+    'Startup microbenchmark time per call by strategy and batch size',
+    ['strategy', 'batch_size'],
+    multiprocess_mode='livemax'
+)
+
+# Early-exit inference: rata-rata jumlah tree yang dievaluasi per baris, per panggilan model
+# (satu micro-batch bisa berisi beberapa request); warmup dan kalibrasi tidak ikut
+early_exit_trees_evaluated = Histogram(
+    'early_exit_trees_evaluated',
+    'Mean number of trees evaluated per row, observed once per early-exit model call '
+    '(a micro-batch can hold several requests); warmup and calibration calls are excluded',
+    buckets=(4, 8, 16, 24, 32, 48, 64, 96, 128, 160, 200, 300, 500)
+)
+
+# Histogram latensi per tahap /predict dan CPU time vs wall time per request;
+# dibuat ulang oleh configure() jika --latency-buckets diberikan
+predict_stage_seconds = None
+predict_wall_seconds = None
+predict_cpu_seconds = None
+
+def build_latency_histograms(buckets=DEFAULT_LATENCY_BUCKETS):
+    """(Re)create histogram latensi /predict dengan bucket yang diberikan"""
+    global predict_stage_seconds, predict_wall_seconds, predict_cpu_seconds
+    for metric in (predict_stage_seconds, predict_wall_seconds, predict_cpu_seconds):
+        if metric is not None:
+            REGISTRY.unregister(metric)
+    predict_stage_seconds = Histogram(
+        'predict_stage_seconds',
+        'Time spent in each /predict stage (parse, validate, inference, serialize)',
+        ['stage'],
+        buckets=buckets
+    )
+    predict_wall_seconds = Histogram(
+        'predict_wall_seconds',
+        'Wall-clock time of a /predict request including failed requests',
+        ['status'],
+        buckets=buckets
+    )
+    predict_cpu_seconds = Histogram(
+        'predict_cpu_seconds',
+        'CPU time of a /predict request: request thread plus its row share of micro-batched model calls',
+        ['status'],
+        buckets=buckets
+    )
+
+build_latency_histograms()
+
 # --------------------------------------------
 # FLASK APP SETUP
 # --------------------------------------------
 app = Flask(__name__)
 model = None  # model global
-request_count = 0
-start_time = time.time()
+model_version = None
+# (model, model_version) di-assign sekaligus: scoring mengambil pasangan ini sekali
+# sehingga hasil, classes_ dan versi di prediction log selalu dari model yang sama
+model_state = (None, None)
+explain_enabled = False  # /explain hanya aktif dengan --enable-explain
+batcher = None  # MicroBatcher, None jika micro-batching dimatikan
+prediction_cache = None  # PredictionCache, None jika cache dimatikan
+admission = None  # AdmissionController, None jika admission control dimatikan
+# Feature attribution (/explain)
+explain_latency_seconds = Histogram(
+    'explain_latency_seconds',
+    'Latency of /explain requests in seconds',
+    buckets=DEFAULT_LATENCY_BUCKETS
+)
+explain_rows_total = Counter(
+    'explain_rows_total',
+    'Number of rows explained by /explain'
+)
+# Nilai node explainer adalah salinan terpisah dari model, tidak masuk model_memory_bytes
+explainer_memory_bytes = Gauge(
+    'explainer_memory_bytes',
+    'Memory held by the /explain node value arrays in bytes',
+    multiprocess_mode='livesum'
+)
+# (model, SaabasExplainer atau None): explainer di-build saat /explain pertama
+# untuk model aktif, lalu dipakai ulang sampai model diganti
+explainer_cache = (None, None)
+explainer_lock = threading.Lock()
+
+# Garbage collector: pause per generasi (gc.callbacks) dan objek yang di-freeze
+gc_pause_seconds = Histogram(
+    'gc_pause_seconds',
+    'Duration of cyclic garbage collection pauses by generation',
+    ['generation'],
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+             0.01, 0.025, 0.05, 0.1, 0.25)
+)
+gc_frozen_objects = Gauge(
+    'gc_frozen_objects',
+    'Objects moved to the permanent generation by gc.freeze()',
+    multiprocess_mode='liveall'
+)
+
+# Prediction log (audit / retraining)
+prediction_log_dropped_total = Counter(
+    'prediction_log_dropped_total',
+    'Prediction rows not logged because the log queue was full or a write failed'
+)
+prediction_log_records_total = Counter(
+    'prediction_log_records_total',
+    'Prediction rows written to log segments'
+)
+prediction_log_flush_seconds = Histogram(
+    'prediction_log_flush_seconds',
+    'Time to write one batch of prediction records to the active segment',
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+)
+prediction_log_queue_depth = Gauge(
+    'prediction_log_queue_depth',
+    'Requests waiting in the prediction log queue',
+    multiprocess_mode='livesum'
+)
+
+model_registry = None  # ModelRegistry untuk /models/<run_id>/predict
+shadow = None  # ShadowMirror, None jika shadow traffic dimatikan
+prediction_logger = None  # PredictionLogger, None jika --prediction-log tidak dipakai
+profiler = None  # SamplingProfiler, hanya aktif dengan --enable-profiler
+planner = None  # ExecutionPlanner, None jika --execution-planner tidak dipakai
+retry_after_seconds = 1  # Nilai header Retry-After untuk response 503
+ready = threading.Event()  # Di-set setelah model ter-load dan warmup selesai
+gc_freeze_enabled = False  # --gc-freeze: freeze heap setelah warmup dan setiap hot reload
+
+# Throughput per detik dalam ring buffer, dibaca saat scrape
+RATE_WINDOWS = (1, 10, 60)
+rate_tracker = RateTracker(horizon=max(RATE_WINDOWS) + 1)
+# serve_prefork.py men-set env ini sebelum modul ini di-import
+MULTIPROCESS_MODE = 'PROMETHEUS_MULTIPROC_DIR' in os.environ
+
+# Jumlah baris per chunk vectorized di /predict/stream (bisa diubah lewat ?chunk_size=)
+STREAM_CHUNK_SIZE = 512
+# Batas atas ?chunk_size=: satu chunk ditahan utuh di memory (matrix + hasil)
+stream_max_chunk_size = 4096
 
 # --------------------------------------------
 # LOAD MODEL
 # --------------------------------------------
-def load_model(model_uri):
-    global model
+def set_model(new_model, version=None):
+    """
+    Satu-satunya tempat model aktif diganti; cache prediksi ikut di-invalidate
+    Assignment referensi bersifat atomik, request yang sedang berjalan
+    tetap memakai model lama yang sudah mereka ambil
+    """
+    global model, model_version, model_state, explainer_cache
+    old_version = model_version
+    model_state = (new_model, version)
+    model = new_model
+    model_version = version
+    # Explainer model lama dilepas; yang baru di-build lagi oleh /explain berikutnya
+    with explainer_lock:
+        explainer_cache = (None, None)
+        explainer_memory_bytes.set(0)
+    if prediction_cache is not None:
+        prediction_cache.invalidate()
+        prediction_cache_entries.set(0)
+        prediction_cache_bytes.set(0)
+    # Set 0 (bukan clear) agar nilai lama juga ter-reset di multiprocess mode
+    if old_version is not None and old_version != version:
+        model_active_version.labels(version=old_version).set(0)
+    if version is not None:
+        model_active_version.labels(version=version).set(1)
+    # Saat startup freeze dan histogram early exit diurus oleh warm_up_server;
+    # di sini hanya untuk hot reload (model sudah di-warm oleh watcher sebelum swap)
+    if ready.is_set():
+        track_early_exit(new_model)
+        if gc_freeze_enabled:
+            freeze_gc()
+
+def freeze_gc():
+    """
+    Pindahkan semua objek yang masih hidup ke permanent generation (gc.freeze())
+    sehingga graph objek model tidak lagi ditelusuri setiap koleksi generasi 2.
+    Objek frozen tetap dibebaskan lewat reference counting saat model diganti;
+    unfreeze tidak dipanggil agar objek yang di-freeze master pre-fork
+    (serve_prefork.py) tidak disentuh lagi oleh worker
+    """
+    gc.collect()
+    gc.freeze()
+    gc_frozen_objects.set(gc.get_freeze_count())
+
+def build_explainer(new_model):
+    """SaabasExplainer untuk model forest, None untuk model lain"""
+    if new_model is None:
+        return None
     try:
-        model = mlflow.sklearn.load_model(model_uri)
-        print(f"Model loaded successfully from {model_uri}")
+        return SaabasExplainer.from_model(new_model)
+    except (ValueError, AttributeError):
+        return None
+
+def get_explainer(active_model):
+    """
+    Explainer untuk active_model, di-build sekali per model (lazy) karena nilai
+    node-nya menggandakan memory array forest. Request concurrent pertama
+    menunggu build yang sama, bukan membangun masing-masing
+    """
+    global explainer_cache
+    cached_model, cached = explainer_cache
+    if cached_model is active_model:
+        return cached
+    with explainer_lock:
+        cached_model, cached = explainer_cache
+        if cached_model is active_model:
+            return cached
+        cached = build_explainer(active_model)
+        # Jangan cache model yang sudah diganti selama build berlangsung
+        if active_model is model:
+            explainer_cache = (active_model, cached)
+            explainer_memory_bytes.set(estimate_model_bytes(cached) if cached is not None else 0)
+        return cached
+
+def build_model(model_uri, engine='sklearn', loader='lean', early_exit=None):
+    """
+    Load model dari model_uri tanpa mengganti model aktif
+    early_exit : dict, optional
+        Argumen EarlyExitForest (block_size, margin) untuk membungkus forest
+    """
+    new_model = load_sklearn_model(model_uri, loader=loader)
+    if engine == 'compiled':
+        new_model = CompiledForest.from_sklearn(new_model)
+    return wrap_early_exit(new_model, early_exit)
+
+def wrap_early_exit(new_model, early_exit=None):
+    """Bungkus forest dengan EarlyExitForest jika early_exit (block_size, margin) diberikan"""
+    if early_exit is None:
+        return new_model
+    # Histogram baru dipasang oleh track_early_exit() setelah warmup/kalibrasi
+    return EarlyExitForest(new_model, **early_exit)
+
+def track_early_exit(target_model):
+    """Mulai mencatat early_exit_trees_evaluated untuk model yang sudah melayani trafik nyata"""
+    if isinstance(target_model, EarlyExitForest):
+        target_model.trees_histogram = early_exit_trees_evaluated
+
+def warm_model(new_model):
+    """Jalankan beberapa prediksi dummy agar panggilan pertama tidak lambat"""
+    n_features = getattr(new_model, 'n_features_in_', None)
+    if n_features is None:
+        return
+    for n_rows in (1, 8, 64):
+        X = np.zeros((n_rows, n_features), dtype=np.float64)
+        new_model.predict(X)
+        if hasattr(new_model, 'predict_proba'):
+            new_model.predict_proba(X)
+
+def load_compiled_model(compiled_path, early_exit=None):
+    """
+    Ganti model aktif dengan CompiledForest hasil export forest_engine.py
+    (--engine compiled tanpa --compiled-path meng-compile lewat build_model)
+    """
+    try:
+        # Array forest di-mmap: halaman dibaca dari page cache sesuai kebutuhan
+        compiled = CompiledForest.load(compiled_path, mmap_mode='r')
+        set_model(wrap_early_exit(compiled, early_exit), version=compiled_path)
+        print(f"Compiled forest loaded from {compiled_path}")
     except Exception as e:
-        print(f"Error loading model: {e}")
+        print(f"Error loading compiled forest: {e}")
 
 # --------------------------------------------
-# UPDATE SYSTEM METRICS
+# INPUT CONVERSION
 # --------------------------------------------
-def update_system_metrics():
-    """Update system metrics (CPU, RAM) secara berkala"""
-    while True:
-        try:
-            # Update CPU usage
-            cpu_percent = psutil.cpu_percent(interval=1)
-            system_cpu_usage.labels(instance='127.0.0.1:8000', job='ml_model_exporter').set(cpu_percent)
-            
-            # Update RAM usage
-            ram_percent = psutil.virtual_memory().percent
-            system_ram_usage.labels(instance='127.0.0.1:8000', job='ml_model_exporter').set(ram_percent)
-            
-            time.sleep(5)  # Update setiap 5 detik
-        except Exception as e:
-            print(f"Error updating system metrics: {e}")
-            time.sleep(5)
+def features_to_matrix(features, target_model=None):
+    """
+    Konversi features (1 baris atau N baris) menjadi matrix contiguous
+    List dari JSON dijadikan float64; array float32/float64 dari payload biner
+    dipakai apa adanya (tanpa copy jika sudah contiguous).
+    Jumlah feature dicek terhadap target_model (default: model aktif)
+    """
+    if features is None:
+        raise ValueError("Field 'features' is required")
+
+    if isinstance(features, np.ndarray) and features.dtype in (np.float32, np.float64):
+        X = np.ascontiguousarray(features)
+    else:
+        X = np.ascontiguousarray(features, dtype=np.float64)
+    if X.ndim == 1:
+        X = X.reshape(1, -1)
+    if X.ndim != 2 or X.shape[0] == 0:
+        raise ValueError(f"'features' must be a single row or a list of rows, got shape {X.shape}")
 
+    n_features = getattr(model if target_model is None else target_model, 'n_features_in_', None)
+    if n_features is not None and X.shape[1] != n_features:
+        raise ValueError(f"Expected {n_features} features per row, got {X.shape[1]}")
+    return X
+
+def parse_return_proba(value):
+    """
+    return_proba dari body JSON atau query string -> bool
+    Hanya boolean JSON atau string true/false/1/0/yes/no; nilai lain (mis. "maybe"
+    atau angka) ditolak 400, bukan diam-diam dianggap True seperti bool("false")
+    """
+    if value is None:
+        return False
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in ('1', 'true', 'yes'):
+            return True
+        if lowered in ('', '0', 'false', 'no'):
+            return False
+    raise ValueError(f"return_proba must be a boolean, got {value!r}")
+
+def decode_predict_payload(fmt, body, headers, query_args):
+    """Body request /predict (JSON atau biner) -> (features, return_proba) sebelum validasi"""
+    if fmt == payload_formats.JSON:
+        # json.JSONDecodeError turunan ValueError -> response 400
+        data = json.loads(body)
+        if not isinstance(data, dict):
+            raise ValueError("JSON body must be an object with a 'features' field")
+        # 'features' bisa berupa satu baris [f1, ..., f11]
+        # atau batch [[f1, ..., f11], [f1, ..., f11], ...]
+        return data.get("features"), parse_return_proba(data.get("return_proba"))
+
+    features = payload_formats.decode_array(body, fmt, headers)
+    return features, parse_return_proba(query_args.get('return_proba'))
+
+def parse_predict_payload(fmt, body, headers, query_args):
+    """Body request /predict (JSON atau biner) -> (X, return_proba)"""
+    features, return_proba = decode_predict_payload(fmt, body, headers, query_args)
+    return features_to_matrix(features), return_proba
+
+def render_predict_result(fmt, preds, proba, classes=None):
+    """
+    Hasil prediksi -> (body, mimetype, headers) dalam format yang sama dengan request
+    Gagal encode setelah inference adalah bug server (500), bukan kesalahan
+    input, jadi ValueError di sini dijadikan RuntimeError
+    """
+    try:
+        if fmt == payload_formats.JSON:
+            result = {"prediction": preds.tolist()}
+            if proba is not None:
+                result["probabilities"] = proba.tolist()
+            return json.dumps(result), 'application/json', {}
+        body, headers = payload_formats.encode_result(preds, proba, fmt, classes)
+        return body, payload_formats.mimetype_for(fmt), headers
+    except ValueError as e:
+        raise RuntimeError(f"Failed to encode response: {e}") from e
+
+def request_deadline(headers):
+    """
+    Deadline request (time.monotonic()) dari header X-Request-Timeout-Ms,
+    None jika tidak ada atau tidak valid
+    """
+    value = headers.get('X-Request-Timeout-Ms')
+    if value is None:
+        return None
+    try:
+        return time.monotonic() + float(value) / 1000.0
+    except ValueError:
+        return None
+
+def predict_rows(X, return_proba=False, target_model=None):
+    """Satu kali panggilan model (default: model aktif) untuk semua baris di X"""
+    if target_model is None:
+        preds, proba, _ = predict_active(X, return_proba)
+        return preds, proba
+    return _predict_with(target_model, X, return_proba, use_planner=False)
+
+def predict_active(X, return_proba=False):
+    """
+    predict_rows untuk model aktif, ditambah (model, version) yang benar-benar
+    menghitungnya; hot reload di tengah jalan tidak mencampur model dan versi
+    """
+    state = model_state
+    preds, proba = _predict_with(state[0], X, return_proba, use_planner=True)
+    return preds, proba, state
+
+def _predict_with(active_model, X, return_proba, use_planner):
+    # Plan dikalibrasi untuk model utama dan memakai worker pool-nya; model lain
+    # (hosted /models/<run_id>) dipanggil langsung agar tidak berebut pool itu
+    if planner is not None and use_planner and hasattr(active_model, 'predict_proba'):
+        # Strategi eksekusi (single / tree_parallel / row_chunk) dipilih per ukuran batch
+        proba = planner.predict_proba(active_model, X)
+        preds = active_model.classes_.take(np.argmax(proba, axis=1))
+        return preds, proba if return_proba else None
+    if return_proba and hasattr(active_model, 'predict_proba'):
+        # predict() pada classifier sklearn = argmax dari predict_proba(),
+        # jadi cukup satu traversal model untuk keduanya
+        proba = active_model.predict_proba(X)
+        preds = active_model.classes_.take(np.argmax(proba, axis=1))
+        return preds, proba
+    return active_model.predict(X), None
+
+def run_model(X, return_proba=False):
+    """Prediksi model aktif lewat micro-batcher jika aktif -> (preds, proba, (model, version))"""
+    if batcher is not None:
+        return batcher.predict(X, return_proba)
+    predict_batch_size.observe(X.shape[0])
+    return predict_active(X, return_proba)
+
+def score(X, return_proba=False):
+    """
+    Pipeline scoring lengkap: prediction cache -> micro-batcher -> model
+    Returns (preds, proba, (model, version)); jika semua baris dari cache,
+    pasangan model aktif saat lookup (cache dikosongkan setiap model berganti)
+    """
+    if prediction_cache is not None:
+        state = model_state
+        preds, proba, *used = prediction_cache.predict(X, return_proba, run_model)
+        prediction_cache_entries.set(len(prediction_cache))
+        prediction_cache_bytes.set(prediction_cache.nbytes)
+        return preds, proba, used[0] if used else state
+    return run_model(X, return_proba)
+
+# --------------------------------------------
+# SYSTEM / PROCESS METRICS
 # --------------------------------------------
-# UPDATE THROUGHPUT
+# CPU, RSS, thread, FD, GC dan ukuran model dihitung saat scrape oleh collector.
+# Di multiprocess mode collector dipasang di registry master (serve_prefork.py)
+gc_tracker = GcPauseTracker(pause_histogram=gc_pause_seconds, defer=MULTIPROCESS_MODE)
+gc_tracker.install()
+if not MULTIPROCESS_MODE:
+    REGISTRY.register(ProcessMetricsCollector(model_fn=lambda: model, gc_tracker=gc_tracker))
+
+# --------------------------------------------
+# THROUGHPUT (SLIDING WINDOW)
 # --------------------------------------------
-def update_throughput():
-    """Update throughput metrics"""
-    global request_count, start_time
+def publish_rates():
+    """Set gauge throughput dari rate_tracker"""
+    throughput_per_minute.set(rate_tracker.success_rate(60) * 60)
+    for window in RATE_WINDOWS:
+        request_rate_per_second.labels(window=f"{window}s").set(rate_tracker.rate(window))
+        error_rate_per_second.labels(window=f"{window}s").set(rate_tracker.error_rate(window))
+
+def publish_rates_loop():
+    """Multiprocess mode: set_function tidak ikut diagregasi, jadi gauge di-set tiap detik"""
     while True:
         try:
-            current_time = time.time()
-            elapsed_minutes = (current_time - start_time) / 60.0
-            if elapsed_minutes > 0:
-                current_throughput = request_count / elapsed_minutes
-                throughput_per_minute.set(current_throughput)
-            time.sleep(60)  # Update setiap 1 menit
+            publish_rates()
+            gc_tracker.flush()
         except Exception as e:
             print(f"Error updating throughput: {e}")
-            time.sleep(60)
+        time.sleep(1)
+
+def install_rate_functions():
+    """Single process: gauge throughput dihitung saat Prometheus scrape"""
+    throughput_per_minute.set_function(lambda: rate_tracker.success_rate(60) * 60)
+    for window in RATE_WINDOWS:
+        label = f"{window}s"
+        request_rate_per_second.labels(window=label).set_function(lambda w=window: rate_tracker.rate(w))
+        error_rate_per_second.labels(window=label).set_function(lambda w=window: rate_tracker.error_rate(w))
+
+if not MULTIPROCESS_MODE:
+    install_rate_functions()
 
 # --------------------------------------------
 # ENDPOINT: HEALTH CHECK
@@ -112,30 +710,82 @@ def health():
         http_requests_total.labels(method='GET', endpoint='/health', status='500').inc()
         return jsonify({"status": "model not loaded"}), 500
 
+# --------------------------------------------
+# ENDPOINT: LIVENESS / READINESS
+# --------------------------------------------
+@app.route("/live", methods=["GET"])
+def live():
+    """Liveness probe: proses hidup dan bisa menjawab HTTP, tanpa cek model"""
+    http_requests_total.labels(method='GET', endpoint='/live', status='200').inc()
+    return jsonify({"status": "alive"}), 200
+
+@app.route("/ready", methods=["GET"])
+def ready_check():
+    """Readiness probe: model sudah ter-load dan warmup selesai"""
+    if model is not None and ready.is_set():
+        http_requests_total.labels(method='GET', endpoint='/ready', status='200').inc()
+        return jsonify({"status": "ready", "model_version": model_version}), 200
+    status = "warming up" if model is not None else "model not loaded"
+    http_requests_total.labels(method='GET', endpoint='/ready', status='503').inc()
+    return jsonify({"status": status}), 503
+
 # --------------------------------------------
 # ENDPOINT: PREDICT
 # --------------------------------------------
 @app.route("/predict", methods=["POST"])
 def predict():
-    global request_count
-    start = time.time()
+    timer = RequestTimer(predict_stage_seconds, predict_wall_seconds, predict_cpu_seconds)
     
     if model is None:
+        rate_tracker.record(error=True)
         http_requests_total.labels(method='POST', endpoint='/predict', status='500').inc()
+        timer.finish('500')
         return jsonify({"error": "Model not loaded"}), 500
 
+    # Ambil slot eksekusi dulu; saat overload request langsung ditolak
+    # sebelum body dibaca dan di-parse
+    slot = admission
+    if slot is not None:
+        try:
+            slot.acquire(request_deadline(request.headers))
+        except Overloaded as e:
+            timer.finish('503')
+            rate_tracker.record(error=True)
+            http_requests_total.labels(method='POST', endpoint='/predict', status='503').inc()
+            return jsonify({"error": str(e)}), 503, {"Retry-After": str(retry_after_seconds)}
+
     try:
-        data = request.get_json()
-        features = data.get("features")
+        # JSON (default), application/x-npy atau raw application/octet-stream
+        with timer.stage('parse'):
+            fmt = payload_formats.request_format(request.mimetype)
+            features, return_proba = decode_predict_payload(fmt, request.get_data(cache=False),
+                                                            request.headers, request.args)
+        with timer.stage('validate'):
+            X = features_to_matrix(features)
+        
+        # Perform prediction (satu panggilan untuk seluruh batch);
+        # baris yang ada di cache tidak dihitung ulang, sisanya digabung
+        # dengan request concurrent lain oleh micro-batcher jika aktif
+        # Probabilitas ikut dihitung untuk prediction log (satu traversal yang sama)
+        with timer.stage('inference'):
+            preds, proba, (used_model, used_version) = score(X, return_proba or prediction_logger is not None)
+        classes = getattr(used_model, 'classes_', None)
+        with timer.stage('serialize'):
+            body, mimetype, headers = render_predict_result(fmt, preds, proba if return_proba else None,
+                                                            classes)
+            response = Response(body, status=200, mimetype=mimetype, headers=headers)
         
-        # Perform prediction
-        preds = model.predict([features])
+        # Mirror ke model shadow setelah response selesai dikirim ke client
+        if shadow is not None:
+            response.call_on_close(lambda: shadow.maybe_submit(X, preds))
         
-        # Calculate latency
-        latency = time.time() - start
+        # Calculate latency (termasuk serialisasi response)
+        latency = timer.finish('200')
+        if prediction_logger is not None:
+            prediction_logger.log(X, preds, proba, latency, used_version, classes)
         
         # Update metrics
-        request_count += 1
+        rate_tracker.record()
         http_requests_total.labels(
             method='POST',
             endpoint='/predict',
@@ -144,43 +794,678 @@ def predict():
         
         api_latency_seconds.labels(endpoint='/predict').observe(latency)
         
-        return jsonify({"prediction": preds.tolist()}), 200
+        return response
+    except ValueError as e:
+        timer.finish('400')
+        rate_tracker.record(error=True)
+        http_requests_total.labels(
+            method='POST',
+            endpoint='/predict',
+            status='400'
+        ).inc()
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
+        timer.finish('500')
+        rate_tracker.record(error=True)
         http_requests_total.labels(
             method='POST',
             endpoint='/predict',
             status='500'
         ).inc()
         return jsonify({"error": str(e)}), 500
+    finally:
+        if slot is not None:
+            slot.release()
+
+# --------------------------------------------
+# ENDPOINT: MULTI-MODEL PREDICT
+# --------------------------------------------
+@app.route("/models", methods=["GET"])
+def list_models():
+    """Model yang sedang di-load oleh /models/<run_id>/predict (LRU di urutan pertama)"""
+    loaded = model_registry.loaded() if model_registry is not None else {}
+    http_requests_total.labels(method='GET', endpoint='/models', status='200').inc()
+    return jsonify({
+        "models": [{"run_id": run_id, "version": version, "bytes": nbytes}
+                   for run_id, (version, nbytes) in loaded.items()],
+        "bytes": model_registry.nbytes if model_registry is not None else 0
+    }), 200
+
+@app.route("/models/<run_id>/predict", methods=["POST"])
+def predict_hosted(run_id):
+    """
+    Prediksi dengan model run_id tertentu; model di-load saat pertama kali diminta
+    Payload sama dengan /predict (tanpa micro-batching dan prediction cache,
+    keduanya terikat ke model aktif)
+    """
+    start = time.perf_counter()
+    endpoint = '/models/predict'
+
+    if model_registry is None or not is_run_id(run_id):
+        http_requests_total.labels(method='POST', endpoint=endpoint, status='404').inc()
+        return jsonify({"error": f"Unknown run_id: {run_id}"}), 404
+
+    slot = admission
+    if slot is not None:
+        try:
+            slot.acquire(request_deadline(request.headers))
+        except Overloaded as e:
+            rate_tracker.record(error=True)
+            http_requests_total.labels(method='POST', endpoint=endpoint, status='503').inc()
+            return jsonify({"error": str(e)}), 503, {"Retry-After": str(retry_after_seconds)}
+
+    try:
+        hosted = model_registry.get(run_id)
+        fmt = payload_formats.request_format(request.mimetype)
+        features, return_proba = decode_predict_payload(fmt, request.get_data(cache=False),
+                                                        request.headers, request.args)
+        X = features_to_matrix(features, hosted)
+        preds, proba = predict_rows(X, return_proba, hosted)
+        body, mimetype, headers = render_predict_result(fmt, preds, proba, getattr(hosted, 'classes_', None))
+
+        rate_tracker.record()
+        http_requests_total.labels(method='POST', endpoint=endpoint, status='200').inc()
+        hosted_model_latency_seconds.labels(run_id=run_id).observe(time.perf_counter() - start)
+        return Response(body, status=200, mimetype=mimetype, headers=headers)
+    except KeyError:
+        http_requests_total.labels(method='POST', endpoint=endpoint, status='404').inc()
+        return jsonify({"error": f"No model artifact found for run_id: {run_id}"}), 404
+    except ValueError as e:
+        rate_tracker.record(error=True)
+        http_requests_total.labels(method='POST', endpoint=endpoint, status='400').inc()
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        rate_tracker.record(error=True)
+        http_requests_total.labels(method='POST', endpoint=endpoint, status='500').inc()
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if slot is not None:
+            slot.release()
+
+# --------------------------------------------
+# ENDPOINT: EXPLAIN
+# --------------------------------------------
+@app.route("/explain", methods=["POST"])
+def explain():
+    """
+    Kontribusi per feature (Saabas) untuk setiap baris, payload sama dengan /predict
+    probabilities[i] = bias + jumlah contributions[i] di semua feature;
+    contributions berbentuk [baris][feature][kelas]
+
+    Selalu dihitung dari semua tree: dengan --early-exit, probabilities (dan
+    kadang prediction jika --early-exit-margin dipakai) bisa berbeda dari
+    /predict yang berhenti lebih awal
+    """
+    start = time.perf_counter()
+    if not explain_enabled:
+        http_requests_total.labels(method='POST', endpoint='/explain', status='404').inc()
+        return jsonify({"error": "Explain is disabled, start the server with --enable-explain"}), 404
+
+    active = get_explainer(model) if model is not None else None
+    if active is None:
+        status = '500' if model is None else '501'
+        http_requests_total.labels(method='POST', endpoint='/explain', status=status).inc()
+        error = "Model not loaded" if model is None else "Active model is not a tree ensemble"
+        return jsonify({"error": error}), int(status)
+
+    slot = admission
+    if slot is not None:
+        try:
+            slot.acquire(request_deadline(request.headers))
+        except Overloaded as e:
+            rate_tracker.record(error=True)
+            http_requests_total.labels(method='POST', endpoint='/explain', status='503').inc()
+            return jsonify({"error": str(e)}), 503, {"Retry-After": str(retry_after_seconds)}
+
+    try:
+        fmt = payload_formats.request_format(request.mimetype)
+        features, _ = decode_predict_payload(fmt, request.get_data(cache=False),
+                                             request.headers, request.args)
+        X = features_to_matrix(features, active)
+        proba, contributions = active.explain(X)
+        preds = active.classes_.take(np.argmax(proba, axis=1))
+        body = json.dumps({
+            "prediction": preds.tolist(),
+            "probabilities": proba.tolist(),
+            "classes": active.classes_.tolist(),
+            "feature_names": active.feature_names,
+            "bias": active.bias.tolist(),
+            "contributions": contributions.tolist()
+        })
+
+        rate_tracker.record()
+        explain_rows_total.inc(X.shape[0])
+        http_requests_total.labels(method='POST', endpoint='/explain', status='200').inc()
+        explain_latency_seconds.observe(time.perf_counter() - start)
+        return Response(body, status=200, mimetype='application/json')
+    except ValueError as e:
+        rate_tracker.record(error=True)
+        http_requests_total.labels(method='POST', endpoint='/explain', status='400').inc()
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        rate_tracker.record(error=True)
+        http_requests_total.labels(method='POST', endpoint='/explain', status='500').inc()
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if slot is not None:
+            slot.release()
+
+# --------------------------------------------
+# ENDPOINT: PREDICT STREAM
+# --------------------------------------------
+@app.route("/predict/stream", methods=["POST"])
+def predict_stream():
+    """
+    Streaming scoring: body NDJSON (application/x-ndjson) atau CSV (text/csv)
+    dibaca per baris, di-score per chunk dan hasilnya di-stream balik sebagai NDJSON
+    """
+    start = time.time()
+
+    if model is None:
+        rate_tracker.record(error=True)
+        http_requests_total.labels(method='POST', endpoint='/predict/stream', status='500').inc()
+        return jsonify({"error": "Model not loaded"}), 500
+
+    try:
+        chunk_size = int(request.args.get('chunk_size', STREAM_CHUNK_SIZE))
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be >= 1")
+        if chunk_size > stream_max_chunk_size:
+            raise ValueError(f"chunk_size must be <= {stream_max_chunk_size}")
+        return_proba = parse_return_proba(request.args.get('return_proba'))
+    except ValueError as e:
+        rate_tracker.record(error=True)
+        http_requests_total.labels(method='POST', endpoint='/predict/stream', status='400').inc()
+        return jsonify({"error": str(e)}), 400
+
+    # Satu stream memegang satu slot admission selama body dibaca dan di-score
+    slot = admission
+    if slot is not None:
+        try:
+            slot.acquire(request_deadline(request.headers))
+        except Overloaded as e:
+            rate_tracker.record(error=True)
+            http_requests_total.labels(method='POST', endpoint='/predict/stream', status='503').inc()
+            return jsonify({"error": str(e)}), 503, {"Retry-After": str(retry_after_seconds)}
+    release_once = threading.Lock()
+
+    def release_slot():
+        # Dipanggil dari finally generator dan saat response ditutup; generator
+        # yang tidak pernah dimulai (client putus) tidak menjalankan finally-nya
+        if slot is not None and release_once.acquire(blocking=False):
+            slot.release()
+
+    if stream_scoring.stream_format(request.mimetype) == stream_scoring.CSV:
+        row_parser = stream_scoring.CsvRowParser()
+    else:
+        row_parser = stream_scoring.NdjsonRowParser()
+    body_stream = request.stream
+
+    def generate():
+        # Status HTTP sudah 200 begitu stream dimulai, error dikirim in-band
+        status = '200'
+        try:
+            lines = stream_scoring.iter_lines(body_stream)
+            yield from stream_scoring.score_stream(
+                lines, row_parser, features_to_matrix, lambda X, rp: score(X, rp)[:2],
+                chunk_size=chunk_size, return_proba=return_proba
+            )
+        except ValueError as e:
+            status = '400'
+            yield (json.dumps({"error": str(e)}) + '\n').encode('utf-8')
+        except Exception as e:
+            status = '500'
+            yield (json.dumps({"error": str(e)}) + '\n').encode('utf-8')
+        finally:
+            release_slot()
+            rate_tracker.record(error=status != '200')
+            http_requests_total.labels(method='POST', endpoint='/predict/stream', status=status).inc()
+            api_latency_seconds.labels(endpoint='/predict/stream').observe(time.time() - start)
+
+    response = Response(stream_with_context(generate()), status=200, mimetype='application/x-ndjson')
+    response.call_on_close(release_slot)
+    return response
+
+# --------------------------------------------
+# ENDPOINT: DEBUG PROFILE
+# --------------------------------------------
+@app.route("/debug/profile", methods=["GET"])
+def debug_profile():
+    """
+    Sampling semua thread selama ?seconds=N dan kembalikan collapsed stacks
+    (input flamegraph.pl / speedscope); hanya aktif dengan --enable-profiler
+    """
+    if profiler is None:
+        http_requests_total.labels(method='GET', endpoint='/debug/profile', status='404').inc()
+        return jsonify({"error": "Profiler disabled, start the server with --enable-profiler"}), 404
+    try:
+        seconds = float(request.args.get('seconds', 5))
+        stacks, stats = profiler.profile(seconds)
+    except ProfilerBusy as e:
+        http_requests_total.labels(method='GET', endpoint='/debug/profile', status='429').inc()
+        return jsonify({"error": str(e)}), 429, {"Retry-After": str(int(e.retry_after) + 1)}
+    except ValueError as e:
+        http_requests_total.labels(method='GET', endpoint='/debug/profile', status='400').inc()
+        return jsonify({"error": str(e)}), 400
+
+    http_requests_total.labels(method='GET', endpoint='/debug/profile', status='200').inc()
+    return Response(format_collapsed(stacks), status=200, mimetype='text/plain', headers={
+        'X-Profile-Samples': str(stats['samples']),
+        'X-Profile-Interval-Ms': f"{stats['interval'] * 1000:.2f}",
+        'X-Profile-Overhead': f"{stats['overhead']:.4f}",
+    })
+
+# --------------------------------------------
+# WARMUP
+# --------------------------------------------
+def warmup_request(X):
+    """
+    Satu request sintetis lewat jalur /predict: decode JSON -> validasi ->
+    micro-batcher/model -> serialisasi (prediction cache dilewati)
+    """
+    body = json.dumps({"features": X.tolist(), "return_proba": True})
+    features, return_proba = decode_predict_payload(payload_formats.JSON, body, {}, {})
+    preds, proba, _ = run_model(features_to_matrix(features), return_proba)
+    render_predict_result(payload_formats.JSON, preds, proba)
+
+def warm_up_server(args):
+    """Tunggu model ter-load, jalankan warmup lalu tandai server ready"""
+    while model is None:
+        time.sleep(0.5)
+
+    n_features = getattr(model, 'n_features_in_', None)
+    if args.warmup_iterations > 0 and n_features is not None:
+        start = time.perf_counter()
+        try:
+            replay_rows = load_replay_rows(args.warmup_data)
+            summary = run_warmup(
+                warmup_request, n_features,
+                batch_sizes=args.warmup_batch_sizes,
+                iterations=args.warmup_iterations,
+                replay_rows=replay_rows,
+                latency_histogram=warmup_latency_seconds
+            )
+        except Exception as e:
+            # Warmup gagal bukan alasan untuk menolak trafik selamanya
+            print(f"Error during warmup: {e}")
+        else:
+            for (source, batch_size), latency in summary.items():
+                print(f"Warmup {source:<9} batch {batch_size:>5}: {latency * 1000:.2f} ms/request")
+        duration = time.perf_counter() - start
+        warmup_duration_seconds.set(duration)
+        print(f"Warmup finished in {duration:.2f}s")
+
+    # Model dan objek yang dibuat saat warmup (import, cache, thread) sudah lengkap
+    if gc_freeze_enabled:
+        freeze_gc()
+        print(f"GC freeze   : {gc.get_freeze_count()} objects moved to the permanent generation")
+
+    # Warmup dan kalibrasi planner (di configure) sudah lewat
+    track_early_exit(model)
+    ready.set()
+    server_ready.set(1)
+
+# --------------------------------------------
+# SERVER SETUP
+# --------------------------------------------
+def build_arg_parser():
+    """Argument CLI server (dipakai juga oleh serve_prefork.py)"""
+    parser = argparse.ArgumentParser(description='Prometheus model monitoring server')
+    parser.add_argument('--batch-max-size', type=int, default=64,
+                        help='Jumlah baris maksimum per micro-batch (default: 64)')
+    parser.add_argument('--batch-max-wait-ms', type=float, default=2.0,
+                        help='Waktu tunggu maksimum micro-batch dalam ms (default: 2.0)')
+    parser.add_argument('--no-batching', action='store_true',
+                        help='Matikan micro-batching, setiap request memanggil model sendiri')
+    parser.add_argument('--stream-max-chunk-size', type=int, default=4096,
+                        help='Nilai ?chunk_size= maksimum untuk /predict/stream, lebih besar ditolak 400 '
+                             '(default: 4096)')
+    parser.add_argument('--model-uri', type=str, default=None,
+                        help='Path/URI model MLflow')
+    parser.add_argument('--run-id', type=str, default=None,
+                        help='MLflow run ID (dicari seperti serve_model_direct.py)')
+    parser.add_argument('--pointer-file', type=str, default=None,
+                        help='File berisi run ID atau path model yang harus dilayani')
+    parser.add_argument('--watch', action='store_true',
+                        help='Hot reload: pantau pointer file / run terbaru dan swap model baru')
+    parser.add_argument('--watch-interval', type=float, default=10.0,
+                        help='Jeda polling hot reload dalam detik (default: 10)')
+    parser.add_argument('--engine', choices=['sklearn', 'compiled'], default='sklearn',
+                        help='Engine inference: sklearn atau compiled array-backed forest (default: sklearn)')
+    parser.add_argument('--loader', choices=['lean', 'mlflow'], default='lean',
+                        help='Cara load model: lean (baca MLmodel + pickle langsung, fallback MLflow) '
+                             'atau mlflow (default: lean)')
+    parser.add_argument('--compiled-path', type=str, default=None,
+                        help='Folder hasil "forest_engine.py export" (untuk --engine compiled)')
+    parser.add_argument('--cache-max-entries', type=int, default=0,
+                        help='Jumlah entry maksimum prediction cache, 0 = cache mati (default: 0)')
+    parser.add_argument('--cache-max-mb', type=float, default=64.0,
+                        help='Batas memori prediction cache dalam MB (default: 64)')
+    parser.add_argument('--cache-ttl', type=float, default=300.0,
+                        help='TTL entry prediction cache dalam detik, 0 = tanpa TTL (default: 300)')
+    parser.add_argument('--cache-decimals', type=int, default=None,
+                        help='Bulatkan feature ke N desimal sebelum dijadikan key cache')
+    parser.add_argument('--models-memory-mb', type=float, default=1024.0,
+                        help='Budget memori model di /models/<run_id>/predict per proses; model LRU '
+                             'dikeluarkan jika terlampaui (default: 1024)')
+    parser.add_argument('--shadow-run-id', type=str, default=None,
+                        help='Run ID model kandidat yang menerima salinan trafik /predict')
+    parser.add_argument('--shadow-model-uri', type=str, default=None,
+                        help='Path model kandidat (alternatif --shadow-run-id)')
+    parser.add_argument('--shadow-fraction', type=float, default=0.1,
+                        help='Proporsi request /predict yang di-mirror ke shadow (default: 0.1)')
+    parser.add_argument('--shadow-max-queue', type=int, default=32,
+                        help='Request shadow yang boleh antri; lebihnya dibuang (default: 32)')
+    parser.add_argument('--shadow-workers', type=int, default=1,
+                        help='Jumlah thread untuk prediksi shadow (default: 1)')
+    parser.add_argument('--early-exit', action='store_true',
+                        help='Early-exit forest: berhenti mengevaluasi tree begitu vote sudah pasti')
+    parser.add_argument('--early-exit-block-size', type=int, default=8,
+                        help='Jumlah tree per blok sebelum cek early exit (default: 8)')
+    parser.add_argument('--early-exit-margin', type=float, default=None,
+                        help='Berhenti juga jika selisih proba kelas teratas dan kedua >= margin '
+                             '(default: hanya jika argmax tidak bisa berubah)')
+    parser.add_argument('--enable-explain', action='store_true',
+                        help='Aktifkan /explain; nilai node Saabas di-build saat request pertama per model '
+                             '(tambahan memory kira-kira sebesar array forest, per worker). '
+                             'Probabilitas /explain selalu dari semua tree, juga dengan --early-exit')
+    parser.add_argument('--execution-planner', action='store_true',
+                        help='Pilih strategi eksekusi model (single/tree_parallel/row_chunk) per ukuran batch, '
+                             'dikalibrasi saat startup')
+    parser.add_argument('--planner-workers', type=int, default=None,
+                        help='Ukuran worker pool execution planner (default: jumlah CPU)')
+    parser.add_argument('--planner-batch-sizes', type=lambda v: [int(x) for x in v.split(',')],
+                        default=[1, 8, 64, 512, 4096],
+                        help='Ukuran batch untuk kalibrasi planner, dipisah koma (default: 1,8,64,512,4096)')
+    parser.add_argument('--enable-profiler', action='store_true',
+                        help='Aktifkan /debug/profile?seconds=N (sampling profiler, collapsed stacks)')
+    parser.add_argument('--profile-interval-ms', type=float, default=5.0,
+                        help='Jeda awal antar sampel profiler dalam ms (default: 5)')
+    parser.add_argument('--profile-max-seconds', type=float, default=30.0,
+                        help='Durasi maksimum satu profil (default: 30)')
+    parser.add_argument('--profile-max-overhead', type=float, default=0.02,
+                        help='Proporsi waktu maksimum untuk sampling sebelum interval diperbesar (default: 0.02)')
+    parser.add_argument('--profile-cooldown', type=float, default=30.0,
+                        help='Jeda minimum antar profil dalam detik (default: 30)')
+    parser.add_argument('--max-in-flight', type=int, default=0,
+                        help='Admission control: request /predict yang diproses bersamaan per proses, '
+                             '0 = tanpa batas (default: 0)')
+    parser.add_argument('--max-queue', type=int, default=64,
+                        help='Request yang boleh menunggu slot sebelum ditolak 503 (default: 64)')
+    parser.add_argument('--queue-timeout-ms', type=float, default=100.0,
+                        help='Waktu tunggu maksimum di antrian admission dalam ms (default: 100)')
+    parser.add_argument('--retry-after', type=int, default=1,
+                        help='Nilai header Retry-After untuk response 503 (default: 1)')
+    parser.add_argument('--warmup-iterations', type=int, default=10,
+                        help='Prediksi warmup per (sumber, ukuran batch) sebelum /ready, 0 = tanpa warmup (default: 10)')
+    parser.add_argument('--warmup-batch-sizes', type=lambda v: [int(x) for x in v.split(',')],
+                        default=[1, 8, 64, 512],
+                        help='Ukuran batch warmup, dipisah koma (default: 1,8,64,512)')
+    parser.add_argument('--warmup-data', type=str, default=default_data_path(),
+                        help='CSV berisi baris nyata untuk di-replay saat warmup '
+                             '(default: dataset preprocessing)')
+    parser.add_argument('--prediction-log', type=str, default=None, metavar='DIR',
+                        help='Simpan input, output, versi model dan latensi setiap /predict '
+                             'ke segment biner di folder ini (default: nonaktif)')
+    parser.add_argument('--prediction-log-queue', type=int, default=10000,
+                        help='Request yang boleh menunggu ditulis sebelum dibuang (default: 10000)')
+    parser.add_argument('--prediction-log-segment-mb', type=float, default=64.0,
+                        help='Rotasi segment setelah ukuran ini dalam MB (default: 64)')
+    parser.add_argument('--prediction-log-segment-seconds', type=float, default=3600.0,
+                        help='Rotasi segment setelah umur ini dalam detik (default: 3600)')
+    parser.add_argument('--gc-freeze', action='store_true',
+                        help='gc.freeze() setelah model di-load dan warmup selesai (dan setiap hot reload) '
+                             'agar graph objek model keluar dari working set GC')
+    parser.add_argument('--gc-threshold', type=int, nargs='+', default=None, metavar='N',
+                        help='Threshold GC generasi 0 [1 [2]] untuk gc.set_threshold '
+                             '(default: bawaan Python, mis. 700 10 10)')
+    parser.add_argument('--latency-buckets', type=parse_buckets, default=None,
+                        help='Bucket histogram latensi per tahap /predict dalam detik, '
+                             'dipisah koma (default: 0.00005 s/d 2.5)')
+    return parser
+
+def resolve_model_source(args):
+    """Sumber model: pointer file > model URI > run ID > run terbaru di mlruns/mlartifacts"""
+    if args.pointer_file:
+        return (lambda: resolve_pointer_file(args.pointer_file)), f"pointer file {args.pointer_file}"
+    if args.model_uri:
+        return (lambda: ModelSource(args.model_uri, args.model_uri)), args.model_uri
+    if args.run_id:
+        return (lambda: resolve_run_id(args.run_id)), f"run {args.run_id}"
+    return resolve_latest_run, "latest run in mlruns/mlartifacts"
+
+def configure(args):
+    """
+    Setup cache, load model dan siapkan micro-batcher tanpa menjalankan thread apa pun,
+    sehingga aman dipanggil sebelum fork (lihat serve_prefork.py)
+
+    Returns:
+    --------
+    watcher : ModelWatcher atau None
+    """
+    global prediction_cache, batcher, admission, retry_after_seconds, model_registry, shadow, profiler
+    global planner, gc_freeze_enabled, prediction_logger, explain_enabled, stream_max_chunk_size
+
+    if args.latency_buckets:
+        build_latency_histograms(args.latency_buckets)
+
+    if args.gc_threshold:
+        if len(args.gc_threshold) > 3 or any(value < 0 for value in args.gc_threshold):
+            raise SystemExit("--gc-threshold expects 1 to 3 non-negative integers")
+        gc.set_threshold(*args.gc_threshold)
+    gc_freeze_enabled = args.gc_freeze
+    explain_enabled = args.enable_explain
+    if args.stream_max_chunk_size < 1:
+        raise SystemExit("--stream-max-chunk-size must be >= 1")
+    if args.compiled_path and args.watch:
+        # Folder export dibaca sekali; hot reload hanya untuk sumber model MLflow
+        raise SystemExit("--watch is not supported with --compiled-path")
+    stream_max_chunk_size = args.stream_max_chunk_size
+
+    resolve_source, model_source_desc = resolve_model_source(args)
+
+    print(f"Model       : {model_source_desc}")
+    if args.watch:
+        print(f"Hot reload  : every {args.watch_interval}s")
+    print(f"Engine      : {args.engine}")
+    if args.early_exit:
+        margin = 'exact' if args.early_exit_margin is None else f"margin {args.early_exit_margin}"
+        print(f"Early exit  : {args.early_exit_block_size} trees per block, {margin}")
+    if args.no_batching:
+        print("Batching    : disabled")
+    else:
+        print(f"Batching    : max {args.batch_max_size} rows / {args.batch_max_wait_ms} ms")
+    if args.max_in_flight > 0:
+        print(f"Admission   : {args.max_in_flight} in flight / {args.max_queue} queued / "
+              f"{args.queue_timeout_ms} ms")
+    if args.gc_freeze or args.gc_threshold:
+        freeze = 'after warmup' if args.gc_freeze else 'off'
+        print(f"GC          : threshold {gc.get_threshold()}, freeze {freeze}")
+    if args.prediction_log:
+        print(f"Pred. log   : {args.prediction_log} ({args.prediction_log_segment_mb:g} MB / "
+              f"{args.prediction_log_segment_seconds:g}s segments)")
+    if args.cache_max_entries > 0:
+        print(f"Cache       : {args.cache_max_entries} entries / {args.cache_max_mb} MB / TTL {args.cache_ttl}s")
+    print("============================================================")
+
+    if args.max_in_flight > 0:
+        admission = AdmissionController(
+            args.max_in_flight,
+            max_queue=args.max_queue,
+            queue_timeout=args.queue_timeout_ms / 1000.0,
+            shed_counter=admission_shed_total,
+            queue_depth_gauge=admission_queue_depth,
+            in_flight_gauge=admission_in_flight,
+            queue_wait_histogram=admission_queue_wait_seconds
+        )
+    retry_after_seconds = args.retry_after
+
+    if args.enable_profiler:
+        profiler = SamplingProfiler(
+            interval=args.profile_interval_ms / 1000.0,
+            max_seconds=args.profile_max_seconds,
+            max_overhead=args.profile_max_overhead,
+            cooldown=args.profile_cooldown
+        )
+
+    # Setup prediction cache sebelum model di-load
+    if args.cache_max_entries > 0:
+        prediction_cache = PredictionCache(
+            max_entries=args.cache_max_entries,
+            max_bytes=int(args.cache_max_mb * 1024 * 1024),
+            ttl_seconds=args.cache_ttl or None,
+            decimals=args.cache_decimals,
+            hits_counter=prediction_cache_hits_total,
+            misses_counter=prediction_cache_misses_total,
+            evictions_counter=prediction_cache_evictions_total
+        )
+
+    early_exit = None
+    if args.early_exit:
+        early_exit = {'block_size': args.early_exit_block_size, 'margin': args.early_exit_margin}
+
+    # Load model
+    print("Loading model...")
+    watcher = None
+    if args.engine == 'compiled' and args.compiled_path:
+        load_compiled_model(args.compiled_path, early_exit)
+    else:
+        # Load awal memakai jalur yang sama dengan hot reload
+        watcher = ModelWatcher(
+            resolve_source,
+            load_fn=lambda uri: build_model(uri, args.engine, args.loader, early_exit),
+            swap_fn=set_model,
+            warmup_fn=warm_model,
+            interval=args.watch_interval,
+            reload_histogram=model_reload_duration_seconds,
+            reload_counter=model_reloads_total
+        )
+        watcher.check_once()
+        if model is None:
+            print("Error loading model: no model found, gunakan --model-uri atau --run-id")
+
+    # Kalibrasi strategi eksekusi pada model yang dilayani
+    if args.execution_planner and model is not None and hasattr(model, 'predict_proba'):
+        calibrating = ExecutionPlanner(
+            workers=args.planner_workers,
+            plan_counter=execution_plan_total,
+            plan_histogram=execution_plan_seconds,
+            calibration_gauge=execution_plan_calibration_seconds
+        )
+        start = time.perf_counter()
+        calibrating.calibrate(model, batch_sizes=args.planner_batch_sizes)
+        planner = calibrating
+        print(f"Planner     : {planner.describe()} ({planner.workers} workers, "
+              f"calibrated in {time.perf_counter() - start:.2f}s)")
+
+    # Model tambahan untuk /models/<run_id>/predict di-load saat pertama kali diminta
+    def load_hosted_model(uri):
+        hosted = build_model(uri, args.engine, args.loader)
+        warm_model(hosted)
+        return hosted
+
+    model_registry = ModelRegistry(
+        resolve_run_id,
+        load_fn=load_hosted_model,
+        size_fn=estimate_model_bytes,
+        max_bytes=int(args.models_memory_mb * 1024 * 1024),
+        load_histogram=hosted_model_load_duration_seconds,
+        load_counter=hosted_model_loads_total,
+        eviction_counter=hosted_model_evictions_total,
+        loaded_gauge=hosted_models_loaded,
+        bytes_gauge=hosted_models_bytes
+    )
+
+    # Model shadow: di-load sekali di awal, executor-nya baru membuat thread saat dipakai
+    if args.shadow_run_id or args.shadow_model_uri:
+        shadow_source = (resolve_run_id(args.shadow_run_id) if args.shadow_run_id
+                         else ModelSource(args.shadow_model_uri, args.shadow_model_uri))
+        if shadow_source is None:
+            print(f"Error loading shadow model: run {args.shadow_run_id} not found")
+        else:
+            shadow_model = load_hosted_model(shadow_source.uri)
+            shadow = ShadowMirror(
+                # Langsung ke model shadow di executor-nya sendiri, tanpa planner model utama
+                shadow_model.predict,
+                fraction=args.shadow_fraction,
+                max_queue=args.shadow_max_queue,
+                workers=args.shadow_workers,
+                latency_histogram=shadow_latency_seconds,
+                requests_counter=shadow_requests_total,
+                rows_counter=shadow_rows_total,
+                agreement_gauge=shadow_agreement_ratio
+            )
+            print(f"Shadow      : {shadow_source.version} ({args.shadow_fraction:.0%} of /predict)")
+
+    # Writer thread prediction log di-start oleh start_background_threads()
+    if args.prediction_log:
+        prediction_logger = PredictionLogger(
+            args.prediction_log,
+            max_queue=args.prediction_log_queue,
+            max_segment_bytes=int(args.prediction_log_segment_mb * 1024 * 1024),
+            max_segment_seconds=args.prediction_log_segment_seconds,
+            dropped_counter=prediction_log_dropped_total,
+            records_counter=prediction_log_records_total,
+            flush_histogram=prediction_log_flush_seconds,
+            queue_depth_gauge=prediction_log_queue_depth
+        )
+
+    # Micro-batcher dibuat di sini, thread-nya di-start oleh start_background_threads()
+    if not args.no_batching:
+        batcher = MicroBatcher(
+            predict_active,
+            max_batch_size=args.batch_max_size,
+            max_wait_ms=args.batch_max_wait_ms,
+            batch_size_histogram=predict_batch_size,
+            queue_wait_histogram=predict_queue_wait_seconds,
+            batch_cpu_histogram=predict_batch_cpu_seconds
+        )
+
+    return watcher
+
+def start_background_threads(args, watcher):
+    """Start thread batcher, hot reload dan update metrics (sekali per proses)"""
+    if batcher is not None:
+        batcher.start()
+    if prediction_logger is not None:
+        prediction_logger.start()
+
+    # Start hot reload watcher
+    if args.watch and watcher is not None:
+        watcher.start()
+
+    build_ready_gauge()
+    # Warmup di background: server sudah listen (/live = 200) tapi /ready baru 200 setelah selesai
+    threading.Thread(target=warm_up_server, args=(args,), name='warmup', daemon=True).start()
+
+    # Start background thread untuk update metrics (system metrics dihitung saat scrape)
+    if MULTIPROCESS_MODE:
+        threading.Thread(target=publish_rates_loop, daemon=True).start()
 
 # --------------------------------------------
 # MAIN ENTRY
 # --------------------------------------------
 if __name__ == "__main__":
-    # Path model
-    model_uri = r"C:\Users\dinda\Documents\Eksperimen_SML_DindaMaulidiyah\Membangun_model\mlartifacts\192493955283675034\4e687583e8a243a090210fee3dc55b1b\artifacts\model"
+    args = build_arg_parser().parse_args()
 
     print("============================================================")
     print("PROMETHEUS MODEL MONITORING SERVER")
     print("============================================================")
-    print(f"Model path  : {model_uri}")
-    print("============================================================")
-
-    # Load model
-    print("Loading model...")
-    load_model(model_uri)
+    watcher = configure(args)
 
     # Start Prometheus metrics server di port 8000
     print("Starting Prometheus metrics server on port 8000...")
     start_http_server(8000)
     print("Prometheus metrics available at: http://127.0.0.1:8000/metrics")
 
-    # Start background threads untuk update metrics
-    threading.Thread(target=update_system_metrics, daemon=True).start()
-    threading.Thread(target=update_throughput, daemon=True).start()
+    start_background_threads(args, watcher)
 
     # Start Flask app
     print("Starting Flask inference server on port 5001...")
     print("Inference endpoint available at: http://127.0.0.1:5001/predict")
+    print("  (kirim 'features' sebagai list of rows untuk batch scoring)")
+    print("Streaming endpoint available at: http://127.0.0.1:5001/predict/stream")
+    print("Multi-model endpoint available at: http://127.0.0.1:5001/models/<run_id>/predict")
+    print("Probes available at: http://127.0.0.1:5001/live and http://127.0.0.1:5001/ready")
     print("============================================================")
     app.run(host="0.0.0.0", port=5001)
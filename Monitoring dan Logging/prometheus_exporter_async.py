@@ -0,0 +1,239 @@
+"""
+Asyncio/ASGI variant dari prometheus_exporter.py
+Kontrak endpoint (/predict, /health, /live, /ready) dan nama metrics sama dengan versi Flask.
+Koneksi keep-alive yang idle hanya memakan event loop, bukan thread; panggilan
+model berjalan di thread pool berukuran tetap dan jumlah request yang boleh
+diproses/menunggu dibatasi per proses (kelebihannya langsung dijawab 503).
+
+Penggunaan:
+    python prometheus_exporter_async.py --model-uri <path model> --max-concurrency 8
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import uvicorn
+from prometheus_client import start_http_server
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+import payload_formats
+import prometheus_exporter as exporter
+from admission import Overloaded
+from prometheus_exporter import http_requests_total, api_latency_seconds, admission_shed_total
+
+
+class ConcurrencyLimiter:
+    """
+    Semaphore dengan antrian terbatas
+    Maksimal `limit` request berjalan bersamaan dan `max_waiting` request menunggu
+    paling lama `timeout` detik (atau sampai deadline client); request berikutnya
+    langsung ditolak (backpressure) alih-alih menumpuk
+    """
+
+    def __init__(self, limit, max_waiting, timeout=0.1):
+        self.limit = limit
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    def _shed(self, reason):
+        admission_shed_total.labels(reason=reason).inc()
+        raise Overloaded(reason)
+
+    async def acquire(self, deadline=None):
+        """Ambil satu slot atau raise Overloaded (queue_full/timeout/deadline)"""
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+            return
+        if self.waiting >= self.max_waiting:
+            self._shed('queue_full')
+
+        now = time.monotonic()
+        give_up_at = now + self.timeout
+        if deadline is not None:
+            give_up_at = min(give_up_at, deadline)
+        reason = 'deadline' if deadline is not None and give_up_at == deadline else 'timeout'
+        if give_up_at <= now:
+            self._shed(reason)
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), give_up_at - now)
+        except asyncio.TimeoutError:
+            self._shed(reason)
+        finally:
+            self.waiting -= 1
+
+    def release(self):
+        self._semaphore.release()
+
+
+def handle_predict(fmt, body, headers, query_params, deadline):
+    """
+    Parse -> scoring -> render di thread executor: decode JSON dan encode response
+    untuk batch besar juga blocking, jadi tidak boleh berjalan di event loop.
+    Scoring lewat admission control yang sama dengan versi Flask
+    (--max-in-flight, --queue-timeout-ms, X-Request-Timeout-Ms)
+    """
+    X, return_proba = exporter.parse_predict_payload(fmt, body, headers, query_params)
+    want_proba = return_proba or exporter.prediction_logger is not None
+    slot = exporter.admission
+    if slot is None:
+        preds, proba, used = exporter.score(X, want_proba)
+    else:
+        with slot.admit(deadline):
+            preds, proba, used = exporter.score(X, want_proba)
+    rendered = exporter.render_predict_result(fmt, preds, proba if return_proba else None,
+                                              getattr(used[0], 'classes_', None))
+    return X, preds, proba, used, rendered
+
+
+# Diisi oleh main() sebelum server berjalan
+executor = None
+limiter = None
+
+
+# --------------------------------------------
+# ENDPOINT: HEALTH CHECK
+# --------------------------------------------
+async def health(request):
+    if exporter.model is not None:
+        http_requests_total.labels(method='GET', endpoint='/health', status='200').inc()
+        return JSONResponse({"status": "ok"}, status_code=200)
+    http_requests_total.labels(method='GET', endpoint='/health', status='500').inc()
+    return JSONResponse({"status": "model not loaded"}, status_code=500)
+
+
+# --------------------------------------------
+# ENDPOINT: LIVENESS / READINESS
+# --------------------------------------------
+async def live(request):
+    http_requests_total.labels(method='GET', endpoint='/live', status='200').inc()
+    return JSONResponse({"status": "alive"}, status_code=200)
+
+
+async def ready(request):
+    if exporter.model is not None and exporter.ready.is_set():
+        http_requests_total.labels(method='GET', endpoint='/ready', status='200').inc()
+        return JSONResponse({"status": "ready", "model_version": exporter.model_version}, status_code=200)
+    status = "warming up" if exporter.model is not None else "model not loaded"
+    http_requests_total.labels(method='GET', endpoint='/ready', status='503').inc()
+    return JSONResponse({"status": status}, status_code=503)
+
+
+# --------------------------------------------
+# ENDPOINT: PREDICT
+# --------------------------------------------
+async def predict(request):
+    start = time.time()
+
+    if exporter.model is None:
+        exporter.rate_tracker.record(error=True)
+        http_requests_total.labels(method='POST', endpoint='/predict', status='500').inc()
+        return JSONResponse({"error": "Model not loaded"}, status_code=500)
+
+    try:
+        # JSON (default), application/x-npy atau raw application/octet-stream
+        fmt = payload_formats.request_format(request.headers.get('content-type'))
+        body = await request.body()
+        deadline = exporter.request_deadline(request.headers)
+
+        # Parse, scoring (cache -> micro-batcher -> model) dan render bersifat
+        # blocking, jadi dijalankan di executor agar event loop tetap bebas
+        await limiter.acquire(deadline)
+        try:
+            loop = asyncio.get_running_loop()
+            X, preds, proba, (used_model, used_version), (body, mimetype, headers) = await loop.run_in_executor(
+                executor, handle_predict, fmt, body, request.headers, request.query_params, deadline)
+        finally:
+            limiter.release()
+
+        latency = time.time() - start
+        logger = exporter.prediction_logger
+        if logger is not None:
+            logger.log(X, preds, proba, latency, used_version, getattr(used_model, 'classes_', None))
+        exporter.rate_tracker.record()
+        http_requests_total.labels(method='POST', endpoint='/predict', status='200').inc()
+        api_latency_seconds.labels(endpoint='/predict').observe(latency)
+        # Mirror ke model shadow setelah response terkirim
+        background = None
+        if exporter.shadow is not None:
+            background = BackgroundTask(exporter.shadow.maybe_submit, X, preds)
+        return Response(body, status_code=200, media_type=mimetype, headers=headers,
+                        background=background)
+    except Overloaded:
+        # Sudah dihitung di admission_shed_total oleh limiter / AdmissionController
+        exporter.rate_tracker.record(error=True)
+        http_requests_total.labels(method='POST', endpoint='/predict', status='503').inc()
+        return JSONResponse({"error": "Server overloaded, retry later"}, status_code=503,
+                            headers={"Retry-After": str(exporter.retry_after_seconds)})
+    except ValueError as e:
+        exporter.rate_tracker.record(error=True)
+        http_requests_total.labels(method='POST', endpoint='/predict', status='400').inc()
+        return JSONResponse({"error": str(e)}, status_code=400)
+    except Exception as e:
+        exporter.rate_tracker.record(error=True)
+        http_requests_total.labels(method='POST', endpoint='/predict', status='500').inc()
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+
+app = Starlette(routes=[
+    Route("/health", health, methods=["GET"]),
+    Route("/live", live, methods=["GET"]),
+    Route("/ready", ready, methods=["GET"]),
+    Route("/predict", predict, methods=["POST"]),
+])
+
+
+# --------------------------------------------
+# MAIN ENTRY
+# --------------------------------------------
+def main():
+    global executor, limiter
+
+    parser = exporter.build_arg_parser()
+    parser.description = 'Prometheus model monitoring server (asyncio/ASGI)'
+    parser.add_argument('--port', type=int, default=5001,
+                        help='Port inference server (default: 5001)')
+    parser.add_argument('--metrics-port', type=int, default=8000,
+                        help='Port Prometheus metrics (default: 8000)')
+    parser.add_argument('--executor-threads', type=int, default=4,
+                        help='Jumlah thread untuk panggilan model (default: 4)')
+    parser.add_argument('--max-concurrency', type=int, default=None,
+                        help='Request yang boleh diproses bersamaan (default: --executor-threads)')
+    parser.add_argument('--max-waiting', type=int, default=64,
+                        help='Request yang boleh menunggu slot sebelum ditolak 503; menunggu paling lama '
+                             '--queue-timeout-ms atau X-Request-Timeout-Ms (default: 64)')
+    parser.add_argument('--keep-alive', type=int, default=75,
+                        help='Timeout koneksi keep-alive idle dalam detik (default: 75)')
+    args = parser.parse_args()
+
+    print("============================================================")
+    print("PROMETHEUS MODEL MONITORING SERVER (ASYNC)")
+    print("============================================================")
+    max_concurrency = args.max_concurrency or args.executor_threads
+    print(f"Executor    : {args.executor_threads} threads")
+    print(f"Concurrency : {max_concurrency} running / {args.max_waiting} waiting")
+    watcher = exporter.configure(args)
+
+    executor = ThreadPoolExecutor(max_workers=args.executor_threads, thread_name_prefix='predict')
+    limiter = ConcurrencyLimiter(max_concurrency, args.max_waiting, args.queue_timeout_ms / 1000.0)
+
+    print(f"Starting Prometheus metrics server on port {args.metrics_port}...")
+    start_http_server(args.metrics_port)
+    print(f"Prometheus metrics available at: http://127.0.0.1:{args.metrics_port}/metrics")
+
+    exporter.start_background_threads(args, watcher)
+
+    print(f"Inference endpoint available at: http://127.0.0.1:{args.port}/predict")
+    print("============================================================")
+    uvicorn.run(app, host="0.0.0.0", port=args.port,
+                timeout_keep_alive=args.keep_alive, access_log=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Sliding-window rate tracker untuk throughput request
+Ring buffer berisi counter per detik; record() dipanggil di setiap request,
+rate() dihitung saat Prometheus scrape
+"""
+import threading
+import time
+
+
+class RateTracker:
+    """
+    Counter request dan error per detik dalam ring buffer
+
+    Parameters:
+    -----------
+    horizon : int
+        Jumlah detik yang disimpan, harus > window terbesar yang dibaca
+    clock : callable
+        Sumber waktu (detik), default time.monotonic
+    """
+
+    def __init__(self, horizon=61, clock=time.monotonic):
+        self.horizon = horizon
+        self.clock = clock
+        self._seconds = [-1] * horizon
+        self._requests = [0] * horizon
+        self._errors = [0] * horizon
+        # Critical section hanya beberapa operasi integer
+        self._lock = threading.Lock()
+
+    def record(self, error=False):
+        """Catat satu request (error=True untuk request yang gagal)"""
+        now = int(self.clock())
+        idx = now % self.horizon
+        with self._lock:
+            if self._seconds[idx] != now:
+                self._seconds[idx] = now
+                self._requests[idx] = 0
+                self._errors[idx] = 0
+            self._requests[idx] += 1
+            if error:
+                self._errors[idx] += 1
+
+    def _sum(self, counts, window):
+        if window >= self.horizon:
+            raise ValueError(f"window must be < horizon ({self.horizon}s)")
+        now = int(self.clock())
+        total = 0
+        # Hanya detik yang sudah lengkap: [now - window, now - 1]
+        with self._lock:
+            for second in range(now - window, now):
+                idx = second % self.horizon
+                if self._seconds[idx] == second:
+                    total += counts[idx]
+        return total
+
+    def rate(self, window):
+        """Request per detik dalam `window` detik terakhir"""
+        return self._sum(self._requests, window) / window
+
+    def error_rate(self, window):
+        """Request gagal per detik dalam `window` detik terakhir"""
+        return self._sum(self._errors, window) / window
+
+    def success_rate(self, window):
+        """Request sukses per detik dalam `window` detik terakhir"""
+        successes = self._sum(self._requests, window) - self._sum(self._errors, window)
+        return max(successes, 0) / window
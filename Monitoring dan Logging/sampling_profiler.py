@@ -0,0 +1,133 @@
+"""
+Sampling profiler untuk server inference yang sedang berjalan
+Stack semua thread diambil secara berkala lewat sys._current_frames() dan
+dihitung dalam format "collapsed stacks" (satu baris per stack unik:
+`thread;file:func;file:func count`) yang bisa langsung dibuat flame graph
+dengan flamegraph.pl atau speedscope.
+
+Overhead dijaga dengan memperbesar interval sampling jika waktu yang dipakai
+untuk sampling melebihi batas, dan hanya satu profil yang boleh berjalan
+dengan jeda minimum antar profil.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class ProfilerBusy(Exception):
+    """Profil lain sedang berjalan atau jeda antar profil belum lewat"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"profiler busy, retry after {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def collapse_stack(frame, thread_name):
+    """Frame teratas -> 'thread;root;...;leaf'"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.append(thread_name)
+    labels.reverse()
+    return ';'.join(labels)
+
+
+class SamplingProfiler:
+    """
+    Parameters:
+    -----------
+    interval : float
+        Jeda awal antar sampel (detik)
+    max_seconds : float
+        Durasi profil maksimum yang boleh diminta
+    max_overhead : float
+        Proporsi waktu maksimum yang boleh dipakai untuk sampling; jika
+        terlampaui interval diperbesar
+    cooldown : float
+        Jeda minimum (detik) antara akhir satu profil dan awal profil berikutnya
+    """
+
+    def __init__(self, interval=0.005, max_seconds=30.0, max_overhead=0.02, cooldown=30.0):
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.max_overhead = max_overhead
+        self.cooldown = cooldown
+        self._running = threading.Lock()
+        self._last_finished = None
+
+    def profile(self, seconds):
+        """
+        Sampling semua thread (kecuali thread pemanggil) selama `seconds` detik
+
+        Returns:
+        --------
+        stacks : collections.Counter {collapsed stack: jumlah sampel}
+        stats : dict (samples, interval, overhead, seconds)
+        """
+        if not 0 < seconds <= self.max_seconds:
+            raise ValueError(f"seconds must be in (0, {self.max_seconds:g}]")
+        if not self._running.acquire(blocking=False):
+            raise ProfilerBusy(self.cooldown)
+        try:
+            if self._last_finished is not None:
+                wait = self._last_finished + self.cooldown - time.monotonic()
+                if wait > 0:
+                    raise ProfilerBusy(wait)
+            try:
+                return self._sample(seconds)
+            finally:
+                self._last_finished = time.monotonic()
+        finally:
+            self._running.release()
+
+    def _sample(self, seconds):
+        own_id = threading.get_ident()
+        stacks = Counter()
+        interval = self.interval
+        samples = 0
+        busy = 0.0
+        start = time.perf_counter()
+        end = start + seconds
+
+        while True:
+            t0 = time.perf_counter()
+            if t0 >= end:
+                break
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            frames = sys._current_frames()
+            for thread_id, frame in frames.items():
+                if thread_id != own_id:
+                    stacks[collapse_stack(frame, names.get(thread_id, str(thread_id)))] += 1
+            # Jangan tahan referensi frame antar sampel
+            frames = frame = None
+            samples += 1
+            t1 = time.perf_counter()
+            busy += t1 - t0
+
+            # Overhead guard: sampling memegang GIL, jadi jeda antar sampel
+            # diperbesar agar cost / (cost + interval) <= max_overhead
+            min_interval = (t1 - t0) * (1.0 / self.max_overhead - 1.0)
+            if min_interval > interval:
+                interval = min(min_interval, 1.0)
+            time.sleep(max(0.0, min(interval, end - t1)))
+
+        elapsed = time.perf_counter() - start
+        return stacks, {
+            'samples': samples,
+            'interval': interval,
+            'overhead': busy / elapsed if elapsed > 0 else 0.0,
+            'seconds': elapsed,
+        }
+
+
+def format_collapsed(stacks):
+    """Counter stack -> teks collapsed stacks (urut dari stack paling sering)"""
+    return ''.join(f"{stack} {count}\n" for stack, count in stacks.most_common())
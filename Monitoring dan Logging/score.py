@@ -0,0 +1,174 @@
+"""
+Offline batch scoring tanpa model server
+Input CSV (atau folder berisi CSV) dibaca per chunk, chunk dibagi ke process
+pool yang masing-masing me-load model sekali, dan hasil prediksi + probabilitas
+ditulis sesuai urutan input.
+
+Penggunaan:
+    python score.py --run-id <run_id> --input data.csv --output predictions.csv
+    python score.py --run-id <run_id> --input folder_csv/ --output predictions.csv --workers 8
+"""
+import os
+import sys
+import io
+import glob
+import time
+import argparse
+from collections import deque
+from multiprocessing import Pool
+
+import numpy as np
+import pandas as pd
+
+from serve_model_direct import find_model_artifact_path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Fix encoding untuk Windows
+if sys.platform == 'win32' and (sys.stdout.encoding or '').lower() != 'utf-8':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+TARGET_COLUMN = 'quality_category'
+
+# Model per worker process, di-load sekali oleh _init_worker
+_worker_model = None
+
+
+def _init_worker(model_path, engine):
+    global _worker_model
+    from model_loader import load_sklearn_model
+    _worker_model = load_sklearn_model(model_path)
+    if engine == 'compiled':
+        from forest_engine import CompiledForest
+        _worker_model = CompiledForest.from_sklearn(_worker_model)
+
+
+def _score_chunk(X):
+    """Dijalankan di worker: satu panggilan predict_proba untuk seluruh chunk"""
+    if hasattr(_worker_model, 'predict_proba'):
+        proba = _worker_model.predict_proba(X)
+        preds = _worker_model.classes_.take(np.argmax(proba, axis=1))
+        return preds, proba, list(_worker_model.classes_)
+    return _worker_model.predict(X), None, None
+
+
+def list_input_files(input_path):
+    """File CSV input, diurutkan berdasarkan nama jika input berupa folder"""
+    if os.path.isdir(input_path):
+        files = sorted(glob.glob(os.path.join(input_path, '*.csv')))
+        if not files:
+            raise FileNotFoundError(f"Tidak ada file CSV di {input_path}")
+        return files
+    if not os.path.exists(input_path):
+        raise FileNotFoundError(input_path)
+    return [input_path]
+
+
+def iter_chunks(files, chunk_size):
+    """Chunk matrix feature float64 dari semua file, sesuai urutan"""
+    for path in files:
+        for df in pd.read_csv(path, chunksize=chunk_size):
+            df = df.drop(columns=[TARGET_COLUMN], errors='ignore')
+            yield np.ascontiguousarray(df.to_numpy(dtype=np.float64))
+
+
+def peak_rss_mb():
+    """Peak RSS proses utama dan (terbesar) worker dalam MB"""
+    if resource is None:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024 ** 2, None
+    # ru_maxrss dalam KB di Linux, byte di macOS
+    scale = 1024 ** 2 if sys.platform == 'darwin' else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return own, children
+
+
+def write_chunk(output, preds, proba, classes, first):
+    result = pd.DataFrame({'prediction': preds})
+    if proba is not None:
+        for i, cls in enumerate(classes):
+            result[f"proba_{cls}"] = proba[:, i]
+    result.to_csv(output, mode='w' if first else 'a', header=first, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline batch scoring dengan process pool')
+    parser.add_argument('--run-id', type=str, help='MLflow run ID (dicari seperti serve_model_direct.py)')
+    parser.add_argument('--model-uri', type=str, help='Path model langsung (alternatif --run-id)')
+    parser.add_argument('--input', required=True, help='File CSV atau folder berisi CSV')
+    parser.add_argument('--output', required=True, help='File CSV output prediksi')
+    parser.add_argument('--chunk-size', type=int, default=50000, help='Baris per chunk (default: 50000)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Jumlah worker process (default: jumlah CPU)')
+    parser.add_argument('--engine', choices=['sklearn', 'compiled'], default='sklearn',
+                        help='Engine inference di worker (default: sklearn)')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("OFFLINE BATCH SCORING")
+    print("=" * 60)
+
+    if args.model_uri:
+        model_path = args.model_uri
+    elif args.run_id:
+        model_path = find_model_artifact_path(args.run_id)
+        if not model_path:
+            print(f"ERROR: Model artifact tidak ditemukan untuk run_id: {args.run_id}")
+            print("Gunakan: python find_run_id.py untuk melihat run_id yang tersedia")
+            return 1
+    else:
+        print("ERROR: Berikan --run-id atau --model-uri")
+        return 1
+
+    files = list_input_files(args.input)
+    print(f"Model   : {model_path}")
+    print(f"Input   : {len(files)} file(s)")
+    print(f"Output  : {args.output}")
+    print(f"Workers : {args.workers} (chunk {args.chunk_size} rows)")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    total_rows = 0
+    first = True
+    # Jumlah chunk yang sedang diproses dibatasi supaya memori tetap datar;
+    # hasil diambil dari kiri deque sehingga urutan output = urutan input
+    max_in_flight = args.workers * 2
+    pending = deque()
+
+    with Pool(args.workers, initializer=_init_worker, initargs=(model_path, args.engine)) as pool:
+        def drain_one():
+            nonlocal total_rows, first
+            n_rows, result = pending.popleft()
+            preds, proba, classes = result.get()
+            write_chunk(args.output, preds, proba, classes, first)
+            first = False
+            total_rows += n_rows
+            elapsed = time.perf_counter() - start
+            print(f"  {total_rows:,} rows ({total_rows / elapsed:,.0f} rows/sec)")
+
+        for X in iter_chunks(files, args.chunk_size):
+            pending.append((len(X), pool.apply_async(_score_chunk, (X,))))
+            if len(pending) >= max_in_flight:
+                drain_one()
+        while pending:
+            drain_one()
+
+    elapsed = time.perf_counter() - start
+    own_rss, worker_rss = peak_rss_mb()
+    print("=" * 60)
+    print(f"Rows scored   : {total_rows:,}")
+    print(f"Elapsed       : {elapsed:.2f}s")
+    print(f"Throughput    : {total_rows / elapsed if elapsed > 0 else 0:,.0f} rows/sec")
+    print(f"Peak RSS main : {own_rss:,.1f} MB")
+    if worker_rss is not None:
+        print(f"Peak RSS worker (max) : {worker_rss:,.1f} MB")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
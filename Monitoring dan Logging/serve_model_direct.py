@@ -7,8 +7,8 @@ import subprocess
 import argparse
 import io
 
-# Fix encoding untuk Windows
-if sys.platform == 'win32':
+# Fix encoding untuk Windows (sekali saja, modul ini juga di-import oleh server)
+if sys.platform == 'win32' and (sys.stdout.encoding or '').lower() != 'utf-8':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
 def find_model_artifact_path(run_id):
@@ -0,0 +1,129 @@
+"""
+Pre-fork multi-process serving untuk prometheus_exporter.py
+Model di-load sekali di proses master, lalu N worker gunicorn di-fork dan
+berbagi halaman memori model secara copy-on-write. Metrics Prometheus dari
+semua worker digabung dengan prometheus_client multiprocess mode dan
+disajikan oleh master di /metrics.
+
+Hanya untuk Linux/macOS (butuh os.fork dan gunicorn).
+
+Penggunaan:
+    python serve_prefork.py --model-uri <path model> --workers 4 --threads 8
+"""
+import os
+import sys
+import gc
+import argparse
+import shutil
+import tempfile
+
+
+def _prepare_multiproc_dir():
+    """
+    PROMETHEUS_MULTIPROC_DIR harus di-set sebelum prometheus_client di-import,
+    jadi opsi ini di-parse lebih dulu dari argument lain
+    """
+    pre_parser = argparse.ArgumentParser(add_help=False)
+    pre_parser.add_argument('--multiproc-dir', type=str, default=None)
+    known, _ = pre_parser.parse_known_args()
+
+    multiproc_dir = (known.multiproc_dir
+                     or os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+                     or os.path.join(tempfile.gettempdir(), 'prometheus_multiproc'))
+    # File metric dari run sebelumnya harus dibuang, kalau tidak counter ikut terjumlah
+    shutil.rmtree(multiproc_dir, ignore_errors=True)
+    os.makedirs(multiproc_dir, exist_ok=True)
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = multiproc_dir
+    return multiproc_dir
+
+
+MULTIPROC_DIR = _prepare_multiproc_dir()
+
+from gunicorn.app.base import BaseApplication  # noqa: E402
+from prometheus_client import CollectorRegistry, multiprocess, start_http_server  # noqa: E402
+
+import prometheus_exporter as exporter  # noqa: E402
+from process_collector import ProcessMetricsCollector  # noqa: E402
+
+
+class PreforkApplication(BaseApplication):
+    """Gunicorn application yang memakai Flask app yang sudah di-load di master"""
+
+    def __init__(self, application, options):
+        self.application = application
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key, value)
+
+    def load(self):
+        return self.application
+
+
+def main():
+    parser = exporter.build_arg_parser()
+    parser.description = 'Pre-fork multi-process model serving (gunicorn)'
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2,
+                        help='Jumlah worker process (default: jumlah CPU)')
+    parser.add_argument('--threads', type=int, default=4,
+                        help='Jumlah thread per worker (default: 4)')
+    parser.add_argument('--port', type=int, default=5001,
+                        help='Port inference server (default: 5001)')
+    parser.add_argument('--metrics-port', type=int, default=8000,
+                        help='Port Prometheus metrics (default: 8000)')
+    parser.add_argument('--multiproc-dir', type=str, default=None,
+                        help='Folder file metrics multiprocess (default: $TMPDIR/prometheus_multiproc)')
+    args = parser.parse_args()
+
+    print("============================================================")
+    print("PROMETHEUS MODEL MONITORING SERVER (PRE-FORK)")
+    print("============================================================")
+    print(f"Workers     : {args.workers} x {args.threads} threads")
+    print(f"Metrics dir : {MULTIPROC_DIR}")
+    watcher = exporter.configure(args)
+    if exporter.model is None:
+        return 1
+    if args.watch:
+        print("Catatan: dengan --watch setiap worker me-reload modelnya sendiri,")
+        print("         model baru tidak lagi dibagi copy-on-write antar worker")
+
+    # Objek model sudah lengkap; freeze agar GC tidak menyentuh header objeknya
+    # di worker (menulis refcount/GC flag akan menyalin halaman memori)
+    gc.collect()
+    gc.freeze()
+
+    # Master menyajikan /metrics gabungan semua worker
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    # CPU/RSS/thread/FD per worker dibaca dari master saat scrape; GC dan ukuran
+    # model dilaporkan untuk proses master (halaman model dibagi ke semua worker)
+    registry.register(ProcessMetricsCollector(model_fn=lambda: exporter.model, include_children=True))
+    start_http_server(args.metrics_port, registry=registry)
+    print(f"Prometheus metrics available at: http://127.0.0.1:{args.metrics_port}/metrics")
+
+    def post_fork(server, worker):
+        # Thread tidak ikut ter-fork, jadi dijalankan ulang di setiap worker
+        exporter.start_background_threads(args, watcher)
+
+    def child_exit(server, worker):
+        multiprocess.mark_process_dead(worker.pid)
+
+    options = {
+        'bind': f"0.0.0.0:{args.port}",
+        'workers': args.workers,
+        'threads': args.threads,
+        'worker_class': 'gthread',
+        'post_fork': post_fork,
+        'child_exit': child_exit,
+    }
+    print(f"Inference endpoint available at: http://127.0.0.1:{args.port}/predict")
+    print("============================================================")
+    PreforkApplication(exporter.app, options).run()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Server inference dengan metrics di shared memory dan /metrics di proses sidecar
+Semua metrics request-path (Counter/Histogram/Gauge prometheus_client) ditulis
+sebagai increment ke file mmap di tmpfs (default /dev/shm) lewat prometheus_client
+multiprocess mode. Proses server tidak menjalankan start_http_server sama sekali;
+metrics_sidecar.py di-spawn sebagai proses terpisah yang membaca file tersebut
+dan me-render /metrics, sehingga scrape Prometheus tidak lagi berebut GIL
+dengan scoring. Ukuran model dan statistik GC (yang tidak bisa dibaca sidecar
+dari luar) ditulis proses server ke file yang sama setiap beberapa detik.
+
+serve_prefork.py memakai mekanisme yang sama (render di proses master).
+
+Penggunaan:
+    python serve_shm_metrics.py --model-uri <path model>
+"""
+import os
+import sys
+import atexit
+import argparse
+import time
+import shutil
+import tempfile
+import threading
+import subprocess
+
+
+def _prepare_shm_dir():
+    """
+    PROMETHEUS_MULTIPROC_DIR harus di-set sebelum prometheus_client di-import,
+    jadi opsi ini di-parse lebih dulu dari argument lain
+    """
+    pre_parser = argparse.ArgumentParser(add_help=False)
+    pre_parser.add_argument('--multiproc-dir', type=str, default=None)
+    known, _ = pre_parser.parse_known_args()
+
+    # /dev/shm = tmpfs: page mmap tidak pernah di-writeback ke disk
+    base_dir = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    multiproc_dir = (known.multiproc_dir
+                     or os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+                     or os.path.join(base_dir, 'model_server_metrics'))
+    # File metric dari run sebelumnya harus dibuang, kalau tidak counter ikut terjumlah
+    shutil.rmtree(multiproc_dir, ignore_errors=True)
+    os.makedirs(multiproc_dir, exist_ok=True)
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = multiproc_dir
+    return multiproc_dir
+
+
+MULTIPROC_DIR = _prepare_shm_dir()
+
+import prometheus_exporter as exporter  # noqa: E402
+from process_collector import MultiprocessProcessMetrics  # noqa: E402
+
+
+def start_sidecar(metrics_port):
+    """Spawn metrics_sidecar.py yang memantau proses ini; dihentikan saat server keluar"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    sidecar = subprocess.Popen(
+        [sys.executable, os.path.join(script_dir, 'metrics_sidecar.py'),
+         '--multiproc-dir', MULTIPROC_DIR,
+         '--port', str(metrics_port),
+         '--server-pid', str(os.getpid())],
+        cwd=script_dir
+    )
+    atexit.register(sidecar.terminate)
+    return sidecar
+
+
+def publish_process_metrics_loop(interval=5.0):
+    """model_memory_bytes dan model_server_gc_* ditulis ke file mmap untuk sidecar"""
+    publisher = MultiprocessProcessMetrics(model_fn=lambda: exporter.model, gc_tracker=exporter.gc_tracker)
+    while True:
+        try:
+            publisher.publish()
+        except Exception as e:
+            print(f"Error publishing process metrics: {e}")
+        time.sleep(interval)
+
+
+def main():
+    parser = exporter.build_arg_parser()
+    parser.description = 'Model serving dengan metrics shared-memory dan sidecar /metrics'
+    parser.add_argument('--port', type=int, default=5001,
+                        help='Port inference server (default: 5001)')
+    parser.add_argument('--metrics-port', type=int, default=8000,
+                        help='Port /metrics di proses sidecar (default: 8000)')
+    parser.add_argument('--multiproc-dir', type=str, default=None,
+                        help='Folder file metrics mmap (default: /dev/shm/model_server_metrics)')
+    args = parser.parse_args()
+
+    print("============================================================")
+    print("PROMETHEUS MODEL MONITORING SERVER (SHARED-MEMORY METRICS)")
+    print("============================================================")
+    print(f"Metrics dir : {MULTIPROC_DIR}")
+    watcher = exporter.configure(args)
+    if exporter.model is None:
+        return 1
+
+    start_sidecar(args.metrics_port)
+    print(f"Prometheus metrics available at: http://127.0.0.1:{args.metrics_port}/metrics (sidecar)")
+
+    exporter.start_background_threads(args, watcher)
+    threading.Thread(target=publish_process_metrics_loop, name='process-metrics', daemon=True).start()
+
+    print(f"Inference endpoint available at: http://127.0.0.1:{args.port}/predict")
+    print("============================================================")
+    exporter.app.run(host="0.0.0.0", port=args.port)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+Shadow traffic ke model kandidat
+Sebagian request /predict di-mirror ke model shadow setelah response utama
+terkirim. Panggilan shadow berjalan di thread pool terpisah dengan antrian
+terbatas; jika antrian penuh request shadow dibuang, sehingga latensi model
+utama tidak terpengaruh. Latensi shadow dan kecocokan prediksinya dengan
+model utama dicatat sebagai metrics.
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class ShadowMirror:
+    """
+    Parameters:
+    -----------
+    predict_fn : callable
+        predict_fn(X) -> prediksi model shadow
+    fraction : float
+        Proporsi request yang di-mirror (0..1)
+    max_queue : int
+        Jumlah request shadow yang boleh menunggu/berjalan; lebihnya dibuang
+    workers : int
+        Jumlah thread executor shadow
+    latency_histogram : prometheus_client.Histogram, optional
+    requests_counter : prometheus_client.Counter, optional
+        Counter dengan label 'status' (ok/dropped/error)
+    rows_counter : prometheus_client.Counter, optional
+        Counter dengan label 'result' (agree/disagree) per baris
+    agreement_gauge : prometheus_client.Gauge, optional
+        Proporsi baris yang prediksinya sama sejak server start
+    """
+
+    def __init__(self, predict_fn, fraction=0.1, max_queue=32, workers=1, latency_histogram=None,
+                 requests_counter=None, rows_counter=None, agreement_gauge=None):
+        if not 0.0 <= fraction <= 1.0:
+            raise ValueError("fraction must be between 0 and 1")
+        self.predict_fn = predict_fn
+        self.fraction = fraction
+        self.latency_histogram = latency_histogram
+        self.requests_counter = requests_counter
+        self.rows_counter = rows_counter
+        self.agreement_gauge = agreement_gauge
+
+        self._slots = threading.BoundedSemaphore(max_queue)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='shadow')
+        self._lock = threading.Lock()
+        self.rows_agree = 0
+        self.rows_total = 0
+
+    def _count(self, status):
+        if self.requests_counter is not None:
+            self.requests_counter.labels(status=status).inc()
+
+    def maybe_submit(self, X, primary_preds):
+        """Mirror request ini dengan probabilitas `fraction`; tidak pernah blocking"""
+        if self.fraction <= 0.0 or random.random() >= self.fraction:
+            return False
+        if not self._slots.acquire(blocking=False):
+            self._count('dropped')
+            return False
+        try:
+            self._executor.submit(self._run, X, primary_preds)
+        except RuntimeError:
+            # Executor sudah di-shutdown
+            self._slots.release()
+            return False
+        return True
+
+    def _run(self, X, primary_preds):
+        try:
+            start = time.perf_counter()
+            shadow_preds = np.asarray(self.predict_fn(X))
+            latency = time.perf_counter() - start
+        except Exception as e:
+            print(f"Error in shadow prediction: {e}")
+            self._count('error')
+            return
+        finally:
+            self._slots.release()
+
+        agree = int(np.count_nonzero(shadow_preds == np.asarray(primary_preds)))
+        total = len(shadow_preds)
+        with self._lock:
+            self.rows_agree += agree
+            self.rows_total += total
+            ratio = self.rows_agree / self.rows_total if self.rows_total else 1.0
+
+        self._count('ok')
+        if self.latency_histogram is not None:
+            self.latency_histogram.observe(latency)
+        if self.rows_counter is not None:
+            self.rows_counter.labels(result='agree').inc(agree)
+            self.rows_counter.labels(result='disagree').inc(total - agree)
+        if self.agreement_gauge is not None:
+            self.agreement_gauge.set(ratio)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,86 @@
+"""
+Pencatatan latensi per tahap request (parse, validate, inference, serialize)
+dan perbandingan CPU time thread vs wall time per request.
+
+Wall time jauh di atas CPU time berarti request lebih banyak menunggu
+(antrian micro-batching, GIL, I/O) daripada benar-benar menghitung.
+CPU yang dihitung thread lain atas nama request (panggilan model di thread
+micro-batcher) dititipkan lewat record_offloaded_cpu() dan ikut dijumlahkan.
+"""
+import time
+import threading
+from contextlib import contextmanager
+
+_offloaded = threading.local()
+
+# Bucket default untuk latensi forest: mulai 50us, default prometheus_client
+# (mulai 5ms) terlalu kasar untuk tahap parse/serialize dan prediksi 1 baris
+DEFAULT_LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5
+)
+
+
+def parse_buckets(spec):
+    """String "0.0001,0.0005,0.001" -> tuple bucket (detik) yang terurut naik"""
+    try:
+        buckets = tuple(float(value) for value in spec.split(',') if value.strip())
+    except ValueError:
+        raise ValueError(f"invalid bucket list: {spec!r}")
+    if not buckets:
+        raise ValueError("bucket list is empty")
+    if any(b <= 0 for b in buckets) or list(buckets) != sorted(set(buckets)):
+        raise ValueError(f"buckets must be positive and strictly increasing: {spec!r}")
+    return buckets
+
+
+def record_offloaded_cpu(seconds):
+    """Catat CPU time (detik) yang dihabiskan thread lain untuk request di thread ini"""
+    _offloaded.total = offloaded_cpu() + seconds
+
+
+def offloaded_cpu():
+    """Total kumulatif CPU offloaded untuk thread ini"""
+    return getattr(_offloaded, 'total', 0.0)
+
+
+class RequestTimer:
+    """
+    Timer untuk satu request, dibuat di awal handler
+
+    Parameters:
+    -----------
+    stage_histogram : prometheus_client.Histogram, optional
+        Histogram dengan label 'stage'
+    wall_histogram, cpu_histogram : prometheus_client.Histogram, optional
+        Histogram dengan label 'status' untuk wall time dan CPU time thread
+    """
+
+    def __init__(self, stage_histogram=None, wall_histogram=None, cpu_histogram=None):
+        self.stage_histogram = stage_histogram
+        self.wall_histogram = wall_histogram
+        self.cpu_histogram = cpu_histogram
+        self.wall_start = time.perf_counter()
+        # thread_time() hanya menghitung CPU thread ini, bukan thread lain di proses
+        self.cpu_start = time.thread_time()
+        self.offloaded_start = offloaded_cpu()
+
+    @contextmanager
+    def stage(self, name):
+        """Ukur satu tahap; tetap dicatat walaupun tahap tersebut raise"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.stage_histogram is not None:
+                self.stage_histogram.labels(stage=name).observe(time.perf_counter() - start)
+
+    def finish(self, status):
+        """Catat wall time dan CPU time seluruh request; return wall time (detik)"""
+        wall = time.perf_counter() - self.wall_start
+        cpu = (time.thread_time() - self.cpu_start) + (offloaded_cpu() - self.offloaded_start)
+        if self.wall_histogram is not None:
+            self.wall_histogram.labels(status=status).observe(wall)
+        if self.cpu_histogram is not None:
+            self.cpu_histogram.labels(status=status).observe(cpu)
+        return wall
@@ -0,0 +1,147 @@
+"""
+Streaming scoring untuk payload yang sangat besar
+Baris NDJSON/CSV dibaca satu per satu dari body request (boleh chunked),
+di-score per chunk berukuran tetap secara vectorized, dan hasilnya
+di-stream balik sebagai NDJSON begitu chunk selesai. Memori hanya
+sebesar satu chunk, berapa pun ukuran payload.
+"""
+import json
+
+NDJSON = 'ndjson'
+CSV = 'csv'
+
+_CONTENT_TYPES = {
+    'application/x-ndjson': NDJSON,
+    'application/ndjson': NDJSON,
+    'application/jsonl': NDJSON,
+    'text/csv': CSV,
+}
+
+# Kolom target di dataset preprocessing, dibuang jika ikut terkirim
+TARGET_COLUMN = 'quality_category'
+
+
+class StreamError(ValueError):
+    """Baris input tidak valid; membawa nomor baris untuk pesan error"""
+
+    def __init__(self, line_number, message):
+        super().__init__(f"line {line_number}: {message}")
+        self.line_number = line_number
+
+
+def stream_format(mimetype):
+    """Format stream dari Content-Type; NDJSON jika tidak dikenal"""
+    return _CONTENT_TYPES.get((mimetype or '').split(';')[0].strip().lower(), NDJSON)
+
+
+def iter_lines(stream, max_line_bytes=1024 * 1024):
+    """Baca baris dari file-like stream tanpa membaca seluruh body ke memori"""
+    line_number = 0
+    while True:
+        line = stream.readline(max_line_bytes + 1)
+        if not line:
+            return
+        line_number += 1
+        if len(line) > max_line_bytes:
+            raise StreamError(line_number, f"line longer than {max_line_bytes} bytes")
+        line = line.strip()
+        if line:
+            yield line_number, line
+
+
+class NdjsonRowParser:
+    """Satu baris = list feature [f1, ..., f11] atau object {"features": [...]}"""
+
+    def __call__(self, line_number, line):
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            raise StreamError(line_number, f"invalid JSON ({e})")
+        if isinstance(row, dict):
+            row = row.get('features')
+        if not isinstance(row, list):
+            raise StreamError(line_number, "expected a list of features or {\"features\": [...]}")
+        return row
+
+
+class CsvRowParser:
+    """
+    Baris CSV berisi angka; baris pertama yang bukan angka dianggap header
+    (kolom quality_category dibuang jika ada)
+    """
+
+    def __init__(self):
+        self.first_line = True
+        self.drop_index = None
+
+    def __call__(self, line_number, line):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        cells = [cell.strip() for cell in line.split(',')]
+
+        if self.first_line:
+            self.first_line = False
+            try:
+                [float(cell) for cell in cells]
+            except ValueError:
+                if TARGET_COLUMN in cells:
+                    self.drop_index = cells.index(TARGET_COLUMN)
+                return None
+
+        if self.drop_index is not None and len(cells) > self.drop_index:
+            del cells[self.drop_index]
+        try:
+            return [float(cell) for cell in cells]
+        except ValueError as e:
+            raise StreamError(line_number, f"invalid CSV row ({e})")
+
+
+def score_stream(lines, row_parser, to_matrix, score_fn, chunk_size=512, return_proba=False,
+                 on_chunk=None):
+    """
+    Generator NDJSON hasil scoring, satu baris output per baris input
+
+    Parameters:
+    -----------
+    lines : iterable of (line_number, line)
+    row_parser : callable
+        row_parser(line_number, line) -> list feature atau None (dilewati)
+    to_matrix : callable
+        Konversi list of rows menjadi matrix (validasi jumlah feature)
+    score_fn : callable
+        score_fn(X, return_proba) -> (preds, proba)
+    on_chunk : callable, optional
+        on_chunk(n_rows) dipanggil setiap chunk selesai di-score
+    """
+    rows = []
+    first_line = None
+
+    def flush():
+        try:
+            X = to_matrix(rows)
+        except ValueError as e:
+            raise StreamError(first_line, str(e))
+        preds, proba = score_fn(X, return_proba)
+        out = []
+        for i, pred in enumerate(preds.tolist()):
+            record = {"prediction": pred}
+            if proba is not None:
+                record["probabilities"] = proba[i].tolist()
+            out.append(json.dumps(record))
+        if on_chunk is not None:
+            on_chunk(len(rows))
+        return ('\n'.join(out) + '\n').encode('utf-8')
+
+    for line_number, line in lines:
+        row = row_parser(line_number, line)
+        if row is None:
+            continue
+        if not rows:
+            first_line = line_number
+        rows.append(row)
+        if len(rows) >= chunk_size:
+            yield flush()
+            rows = []
+
+    if rows:
+        yield flush()
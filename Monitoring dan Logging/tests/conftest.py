@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Modul server berada di folder induk (tidak ada package), sama seperti saat
+# skrip dijalankan langsung dari "Monitoring dan Logging/"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
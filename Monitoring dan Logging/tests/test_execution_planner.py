@@ -0,0 +1,31 @@
+"""
+ExecutionPlanner: setiap strategi harus sama dengan predict_proba sklearn
+"""
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+
+from execution_planner import ExecutionPlanner, ROW_CHUNK, SINGLE, TREE_PARALLEL
+
+
+@pytest.fixture(scope='module')
+def forest():
+    X, y = make_classification(n_samples=300, n_features=11, n_informative=6,
+                               n_classes=3, random_state=0)
+    return RandomForestClassifier(n_estimators=20, max_depth=6, random_state=0).fit(X, y), X
+
+
+@pytest.mark.parametrize('strategy', [SINGLE, TREE_PARALLEL, ROW_CHUNK])
+def test_strategies_match_sklearn(forest, strategy):
+    model, X = forest
+    planner = ExecutionPlanner(workers=4)
+    assert np.allclose(planner._run(strategy, model, X), model.predict_proba(X))
+
+
+def test_more_workers_than_trees(forest):
+    # Regression: kelompok tree kosong membuat _sum_tree_proba IndexError
+    model, X = forest
+    planner = ExecutionPlanner(workers=32)
+    assert np.allclose(planner._run(TREE_PARALLEL, model, X), model.predict_proba(X))
+    planner.calibrate(model, batch_sizes=(1, 64), repeats=1)
@@ -0,0 +1,73 @@
+"""
+Parity CompiledForest terhadap predict_proba/predict sklearn
+"""
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+
+from forest_engine import CompiledForest, default_data_path
+
+
+@pytest.fixture(scope='module')
+def data():
+    X, y = make_classification(n_samples=600, n_features=11, n_informative=6,
+                               n_classes=3, random_state=0)
+    return X.astype(np.float64), y
+
+
+@pytest.fixture(scope='module')
+def wine():
+    pd = pytest.importorskip('pandas')
+    df = pd.read_csv(default_data_path())
+    X = df.drop(columns=['quality_category']).to_numpy(dtype=np.float64)
+    # quality_category kosong di sebagian baris (hasil preprocessing), tidak bisa jadi label
+    labeled = df['quality_category'].notna().to_numpy()
+    return X, df['quality_category'].to_numpy(), labeled
+
+
+def test_wine_csv_parity(wine):
+    X, y, labeled = wine
+    forest = RandomForestClassifier(n_estimators=50, random_state=42).fit(X[labeled], y[labeled])
+    compiled = CompiledForest.from_sklearn(forest)
+
+    assert np.allclose(compiled.predict_proba(X), forest.predict_proba(X), atol=1e-9)
+    assert np.array_equal(compiled.predict(X), forest.predict(X))
+
+
+@pytest.mark.parametrize('estimator_cls', [RandomForestClassifier, ExtraTreesClassifier])
+def test_predict_proba_matches_sklearn(data, estimator_cls):
+    X, y = data
+    forest = estimator_cls(n_estimators=25, max_depth=8, random_state=0).fit(X, y)
+    compiled = CompiledForest.from_sklearn(forest)
+
+    assert np.allclose(compiled.predict_proba(X), forest.predict_proba(X), atol=1e-12)
+    assert np.array_equal(compiled.predict(X), forest.predict(X))
+
+
+def test_string_classes_and_small_chunks(data):
+    X, y = data
+    labels = np.array(['High', 'Low', 'Medium'])[y]
+    forest = RandomForestClassifier(n_estimators=10, random_state=1).fit(X, labels)
+    compiled = CompiledForest.from_sklearn(forest)
+    # Chunk lebih kecil dari batch: hasil tiap potongan harus tersambung utuh
+    compiled.chunk_size = 7
+
+    assert np.allclose(compiled.predict_proba(X), forest.predict_proba(X), atol=1e-12)
+    assert np.array_equal(compiled.predict(X), forest.predict(X))
+
+
+def test_save_load_mmap_roundtrip(data, tmp_path):
+    X, y = data
+    forest = RandomForestClassifier(n_estimators=10, max_depth=6, random_state=2).fit(X, y)
+    CompiledForest.from_sklearn(forest).save(str(tmp_path))
+    loaded = CompiledForest.load(str(tmp_path), mmap_mode='r')
+
+    assert np.allclose(loaded.predict_proba(X), forest.predict_proba(X), atol=1e-12)
+
+
+def test_rejects_wrong_feature_count(data):
+    X, y = data
+    compiled = CompiledForest.from_sklearn(RandomForestClassifier(n_estimators=3, random_state=0).fit(X, y))
+    with pytest.raises(ValueError):
+        compiled.predict_proba(X[:, :5])